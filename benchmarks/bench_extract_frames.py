@@ -0,0 +1,81 @@
+"""
+Benchmark for the frame sampling strategies behind GenAI.extract_frames.
+
+Writes synthetic videos with OpenCV, then samples them with each method of
+`sample_video_frames` and reports decoded/grabbed frame counts and wall time.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_extract_frames
+"""
+import os
+import time
+import tempfile
+import argparse
+import numpy as np
+import cv2
+from scripts.genai import sample_video_frames
+
+
+def make_synthetic_video(path, seconds=60, fps=30, width=640, height=360):
+    """
+    Writes an MP4 with a moving square and the frame number burned in.
+
+    Returns:
+    -------
+    str
+        The path of the written video.
+    """
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    nframes = int(seconds * fps)
+    for i in range(nframes):
+        frame = np.full((height, width, 3), 40, dtype=np.uint8)
+        x = int((width - 60) * i / max(1, nframes - 1))
+        cv2.rectangle(frame, (x, height // 2 - 30), (x + 60, height // 2 + 30), (0, 200, 255), -1)
+        cv2.putText(frame, f"frame {i}", (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def run_benchmark(video_path, max_samples, methods=("read", "grab", "seek", "auto"), repeats=3):
+    """
+    Samples `video_path` with each method and returns one result dict per method.
+    """
+    results = []
+    for method in methods:
+        timings = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            frames, nframes, fps, stats = sample_video_frames(video_path, max_samples, method=method)
+            timings.append(time.perf_counter() - t0)
+        results.append({
+            "method": method,
+            "used": stats["method"],
+            "frames": len(frames),
+            "decoded": stats["decoded"],
+            "grabbed": stats["grabbed"],
+            "seconds": min(timings),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, nargs="+", default=[10, 60], help="Durations of the synthetic videos.")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--max-samples", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for seconds in args.seconds:
+            video_path = make_synthetic_video(os.path.join(tmpdir, f"synthetic_{seconds:g}s.mp4"), seconds, args.fps)
+            print(f"\n{seconds:g}s @ {args.fps}fps, max_samples={args.max_samples}")
+            print(f"{'method':<8}{'used':<8}{'frames':>8}{'decoded':>10}{'grabbed':>10}{'seconds':>10}")
+            for r in run_benchmark(video_path, args.max_samples, repeats=args.repeats):
+                print(f"{r['method']:<8}{r['used']:<8}{r['frames']:>8}{r['decoded']:>10}{r['grabbed']:>10}{r['seconds']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,32 @@
 import streamlit as st
 import cv2
 import os
+import sys
 import glob
 import time
-import base64
 import json
+import threading
+from collections import deque
 from datetime import datetime
-from openai import OpenAI
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Shared helpers from the repository's scripts/ package
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from scripts.image_prep import prepare_images
+from scripts.openai_clients import get_openai_client
+
 # --- CONFIG ---
 MODEL = "gpt-5-nano" #https://platform.openai.com/docs/models/compare?model=gpt-5-nano
 IMAGES_DIR = "images"
 MAX_IMAGES = 20
 CAPTURE_INTERVAL_SECONDS = 10 # Seconds
+POLL_INTERVAL_SECONDS = 1 # How often the UI picks up new frames from the capture thread
+CAMERA_INDEX = 0
+MAX_IMAGE_EDGE = 768 # Pixels on the longer side of each frame sent to the model
+JPEG_QUALITY = 80
+MAX_PAYLOAD_BYTES = 4 * 1024 * 1024 # Budget for all base64 frames in one request
 PROMPT_FILE = "prompt_reaction.txt"
 YOUTUBE_DATA_FILE = "youtube_data.json"
 DEFAULT_PROMPT_TEMPLATE = (
@@ -49,10 +60,110 @@ def load_prompt_template() -> str:
         log_event(f"Error reading prompt file '{PROMPT_FILE}': {e}. Using default prompt.")
         return DEFAULT_PROMPT_TEMPLATE
 
+# --- BACKGROUND CAPTURE ---
+def open_camera(index=CAMERA_INDEX):
+    # DirectShow opens webcams much faster on Windows; other platforms use the default backend
+    if sys.platform == "win32":
+        return cv2.VideoCapture(index, cv2.CAP_DSHOW)
+    return cv2.VideoCapture(index)
+
+class CameraCapture:
+    """
+    Captures webcam frames on a background thread, so the Streamlit script never blocks on the camera.
+
+    The thread owns the `cv2.VideoCapture` and keeps it open while capturing. It grabs frames
+    continuously (so the driver never hands out a stale buffered frame) and every `interval` seconds
+    pushes a snapshot into a bounded ring buffer. The UI polls `frames_since` and never waits.
+    """
+
+    def __init__(self, camera_index=CAMERA_INDEX, buffer_size=MAX_IMAGES):
+        self.camera_index = camera_index
+        self._frames = deque(maxlen=buffer_size)  # (seq, timestamp, frame), oldest dropped first
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.seq = 0  # Number of frames captured since the service was created
+        self.error = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, max_frames, interval=CAPTURE_INTERVAL_SECONDS):
+        # Starts capturing up to max_frames frames; does nothing if already capturing
+        if self.is_running():
+            return
+        self.error = None
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(max_frames, interval), name="camera-capture", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        # Stops capturing and releases the camera
+        self._stop.set()
+        if self.is_running():
+            self._thread.join(timeout=5)
+
+    def frames_since(self, seq):
+        # Returns the buffered (seq, timestamp, frame) tuples newer than seq, oldest first
+        with self._lock:
+            return [item for item in self._frames if item[0] > seq]
+
+    def _run(self, max_frames, interval):
+        cap = open_camera(self.camera_index)
+        try:
+            if not cap.isOpened():
+                self.error = "Could not access the webcam."
+                log_event(f"ERROR: {self.error}")
+                return
+            log_event(f"Camera opened; capturing {max_frames} frame(s) every {interval}s.")
+            captured = 0
+            next_capture = time.monotonic()
+            while captured < max_frames and not self._stop.is_set():
+                if not cap.grab():
+                    self.error = "Could not read from webcam."
+                    log_event(f"ERROR: {self.error}")
+                    return
+                if time.monotonic() < next_capture:
+                    continue
+                ret, frame = cap.retrieve()
+                if not ret or frame is None:
+                    self.error = "Could not read from webcam."
+                    log_event(f"ERROR: {self.error}")
+                    return
+                with self._lock:
+                    self.seq += 1
+                    self._frames.append((self.seq, time.time(), frame))
+                captured += 1
+                next_capture += interval
+        finally:
+            cap.release()
+            log_event("Camera released.")
+
+@st.cache_resource
+def get_camera_capture():
+    # One capture service per server process: it survives reruns, so the camera is not reopened
+    return CameraCapture()
+
+def save_new_frames(capture):
+    # Writes frames captured since the last poll to IMAGES_DIR
+    for seq, _, frame in capture.frames_since(st.session_state.last_frame_seq):
+        st.session_state.last_frame_seq = seq
+        if st.session_state.img_count >= MAX_IMAGES:
+            continue
+        img_filename = f"screen_shot_{st.session_state.img_count + 1:02d}.png"
+        img_path = os.path.join(IMAGES_DIR, img_filename)
+        if cv2.imwrite(img_path, frame):
+            st.session_state.img_count += 1
+            log_event(f"Saved image: {img_filename} ({img_path})")
+        else:
+            log_event(f"ERROR: Failed to save image: {img_filename} ({img_path})")
+
 # --- OPENAI REACTION SUMMARY ---
 def evaluate_reaction(video_title, video_duration_seconds, video_description=None, 
                       video_transcript=None, iframe_html=None):
-    client = OpenAI()
+    client = get_openai_client()
     image_files = sorted(glob.glob(os.path.join(IMAGES_DIR, "*.png")))
     
     if not image_files:
@@ -82,18 +193,33 @@ def evaluate_reaction(video_title, video_duration_seconds, video_description=Non
         {"type": "text", "text": prompt_text}
     ]
 
-    # Add up to MAX_IMAGES to the prompt
+    # Add up to MAX_IMAGES to the prompt, downscaled and re-encoded to fit the payload budget
+    images_b64, image_stats = prepare_images(
+        image_files[:MAX_IMAGES],
+        max_edge=MAX_IMAGE_EDGE,
+        jpeg_quality=JPEG_QUALITY,
+        max_total_bytes=MAX_PAYLOAD_BYTES,
+        skip_unreadable=True, # A frame still being written or corrupted must not crash the page
+    )
+    if image_stats['num_unreadable']:
+        log_event(f"WARNING: Skipped {image_stats['num_unreadable']} unreadable image(s).")
+    if not images_b64:
+        log_event(f"AI evaluation requested for '{video_title}' but no image could be read.")
+        return "No readable images found to analyze."
+    log_event(
+        f"Prepared {image_stats['num_images']} image(s): {image_stats['original_bytes']:,} -> "
+        f"{image_stats['final_bytes']:,} base64 bytes ({image_stats['bytes_saved']:,} saved, "
+        f"{image_stats['num_dropped']} dropped)."
+    )
     num_images = 0
-    for img_path in image_files[:MAX_IMAGES]:
-        with open(img_path, "rb") as f:
-            img_b64 = base64.b64encode(f.read()).decode("utf-8")
+    for img_b64 in images_b64:
         content.append({
             "type": "image_url",
-            "image_url": {"url": f"data:image/png;base64,{img_b64}"}
+            "image_url": {"url": f"data:image/jpeg;base64,{img_b64}"}
         })
         num_images += 1
     try:
-        log_event(f"Calling AI for '{video_title}' with {min(len(image_files), MAX_IMAGES)} image(s).")
+        log_event(f"Calling AI for '{video_title}' with {num_images} image(s).")
         content.append({"type": "text", "text": f"Number of images provided: {num_images}"})
         response = client.chat.completions.create(
             model=MODEL, 
@@ -134,18 +260,27 @@ selected_description = selected_video.get("description", "") or ""
 selected_transcript = selected_video.get("transcript", "") or ""
 selected_duration_seconds = selected_video.get("duration_seconds", 0)
 
+capture = get_camera_capture()
+
 # Detect change to clear old data
 if "last_video" not in st.session_state or st.session_state.last_video != selected_title:
+    capture.stop()
     clear_images()
     st.session_state.last_video = selected_title
     st.session_state.start_time = None
     st.session_state.img_count = 0
+    st.session_state.capture_started = False
+    st.session_state.last_frame_seq = capture.seq  # Ignore frames taken for the previous video
 
 # Ensure session defaults exist
 if "start_time" not in st.session_state:
     st.session_state.start_time = None
 if "img_count" not in st.session_state:
     st.session_state.img_count = 0
+if "capture_started" not in st.session_state:
+    st.session_state.capture_started = False
+if "last_frame_seq" not in st.session_state:
+    st.session_state.last_frame_seq = capture.seq
 
 # 2. Display Video (iframe HTML from JSON) - centered
 if selected_iframe:
@@ -172,6 +307,7 @@ with col1:
 
     if st.button("Evaluate Response", type="primary"):
         log_event(f"'Evaluate Response' clicked for '{selected_title}'.")
+        save_new_frames(capture)  # Include frames captured since the last poll
         with st.spinner("Analyzing frames..."):
             summary = evaluate_reaction(
                 video_title=selected_title,
@@ -182,50 +318,39 @@ with col1:
             )
             st.session_state.summary = summary
 
-with col2:
-    st.write(f"Images Captured: {len(glob.glob(os.path.join(IMAGES_DIR, '*.png')))} / {MAX_IMAGES}")
-
-# 3. Background Capture Logic (blocking loop; reliable camera capture)
+# 3. Background Capture Logic (a capture thread owns the camera; the UI only polls it)
 if run_study:
     if st.session_state.start_time is None:
         st.session_state.start_time = time.time()
-    
-    cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-    
-    status_placeholder = st.empty()
-    
-    try:
-        while run_study and st.session_state.img_count < MAX_IMAGES:
-            ret, frame = cap.read()
-            if not ret or frame is None:
-                status_placeholder.error("Could not read from webcam.")
-                log_event("ERROR: Could not read from webcam.")
-                break
+    # Start once per recording; a finished or failed capture is not restarted until toggled again
+    if not st.session_state.capture_started and st.session_state.img_count < MAX_IMAGES:
+        capture.start(max_frames=MAX_IMAGES - st.session_state.img_count)
+        st.session_state.capture_started = True
+elif st.session_state.capture_started:
+    capture.stop()
+    st.session_state.capture_started = False
 
-            st.session_state.img_count += 1
-            img_filename = f"screen_shot_{st.session_state.img_count:02d}.png"
-            img_path = os.path.join(IMAGES_DIR, img_filename)
-
-            ok = cv2.imwrite(img_path, frame)
-            if ok:
-                status_placeholder.success(f"Captured {img_filename}")
-                log_event(f"Saved image: {img_filename} ({img_path})")
-            else:
-                status_placeholder.error(f"Failed to save {img_filename}")
-                log_event(f"ERROR: Failed to save image: {img_filename} ({img_path})")
-                break
-            
-            time.sleep(CAPTURE_INTERVAL_SECONDS)
-            
-            if st.session_state.img_count >= MAX_IMAGES:
-                status_placeholder.warning("Max images reached.")
-                log_event(f"Max images reached ({MAX_IMAGES}).")
-                break
-    finally:
-        cap.release()
+@st.fragment(run_every=POLL_INTERVAL_SECONDS if run_study else None)
+def capture_status():
+    # Reruns on its own every POLL_INTERVAL_SECONDS while recording, without rerunning the page
+    save_new_frames(capture)
+    st.write(f"Images Captured: {len(glob.glob(os.path.join(IMAGES_DIR, '*.png')))} / {MAX_IMAGES}")
+    if not run_study:
+        return
+    if capture.error:
+        st.error(capture.error)
+    elif st.session_state.img_count >= MAX_IMAGES:
+        st.warning("Max images reached.")
+    elif st.session_state.img_count:
+        st.success(f"Captured screen_shot_{st.session_state.img_count:02d}.png")
+    elif capture.is_running():
+        st.info("Recording...")
+
+with col2:
+    capture_status()
 
 # 4. Display Results
 if "summary" in st.session_state:
     st.divider()
     st.subheader("AI Reaction Summary")
-    st.write(st.session_state.summary)
\ No newline at end of file
+    st.write(st.session_state.summary)
@@ -1,10 +1,11 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import altair as alt
 from datetime import datetime
 import os
+import sys
 from dotenv import load_dotenv
-import openai
 import re
 import json
 import random
@@ -14,6 +15,33 @@ import plotly.express as px
 # Load environment variables
 load_dotenv()
 
+# Shared helpers from the repository's scripts/ package
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.append(REPO_ROOT)
+from scripts.openai_clients import get_openai_client
+from scripts.response_cache import ResponseCache
+from scripts.background_jobs import BackgroundJobs
+from scripts.embeddings import Embedder
+from scripts.tweet_index import TweetIndex, text_key
+from scripts.engagement_model import EngagementPredictor
+from scripts.tweet_data import content_hash, frame_hash, load_tweets_cached, load_corpus, parse_export_filename
+from scripts.tweet_prompts import build_tweet_context, count_tokens, tweet_lines
+
+# Multi-account TwExportly exports shipped with the repository
+CORPUS_DIR = os.path.join(REPO_ROOT, "data", "TwExportly")
+
+# Processed uploads are stored here as Parquet, keyed by content hash
+DATA_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data_cache")
+
+# Finished AI analyses, keyed by dataset hash, analysis name and prompt version
+ANALYSIS_CACHE_PATH = os.path.join(DATA_CACHE_DIR, "analyses.sqlite")
+
+# Embeddings of every tweet seen so far, shared across datasets and only extended with new texts
+TWEET_INDEX_DIR = os.path.join(DATA_CACHE_DIR, "tweet_index")
+
+# Bump when an analysis prompt or its token budget changes, so cached analyses are recomputed
+ANALYSIS_PROMPT_VERSION = 1
+
 # Configure page
 st.set_page_config(
     page_title="Tweet Analytics Dashboard",
@@ -109,52 +137,108 @@ st.markdown("""
 # Initialize session state
 if 'df' not in st.session_state:
     st.session_state.df = None
-if 'analysis_done' not in st.session_state:
-    st.session_state.analysis_done = False
-if 'personality_done' not in st.session_state:
-    st.session_state.personality_done = False
 if 'selected_tab' not in st.session_state:
     st.session_state.selected_tab = "Overview"
-if 'generated_tweet' not in st.session_state:
-    st.session_state.generated_tweet = None
+if 'sort_index' not in st.session_state:
+    st.session_state.sort_index = None
+if 'data_hash' not in st.session_state:
+    st.session_state.data_hash = None
+if 'tweet_candidates' not in st.session_state:
+    st.session_state.tweet_candidates = None
+
+# Columns offered in the Overview "Sort by" selectbox
+SORT_COLUMNS = ['engagement', 'favorite_count', 'view_count', 'created_at']
+
+# Prompt token budgets for the tweets sent to each AI analysis
+# (gpt-4 has an 8k context, so the marketing report leaves room for its 2,000-token answer)
+VIBE_TWEET_TOKENS = 4000
+PERSONALITY_TWEET_TOKENS = 8000
+GENERATE_TWEET_TOKENS = 4000
+
+# Chart payload limits: points per chart and characters of tweet text in tooltips
+MAX_CHART_POINTS = 2000
+TOOLTIP_TEXT_CHARS = 140
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_processed_data(data_hash, _content):
+    """Parse CSV bytes once per content hash; the leading underscore keeps the bytes out of Streamlit's hashing"""
+    return load_tweets_cached(_content, DATA_CACHE_DIR)
 
 def load_data(uploaded_file):
     """Load and process CSV file"""
     try:
-        df = pd.read_csv(uploaded_file)
-        
-        # Validate required columns
-        required_cols = ['text', 'view_count', 'created_at', 'favorite_count']
-        missing_cols = [col for col in required_cols if col not in df.columns]
-        
-        if missing_cols:
-            st.error(f"Missing required columns: {', '.join(missing_cols)}")
-            return None
-        
-        # Convert created_at to datetime if it's not already
-        df['created_at'] = pd.to_datetime(df['created_at'], errors='coerce')
-        
-        # Ensure numeric columns are numeric
-        df['favorite_count'] = pd.to_numeric(df['favorite_count'], errors='coerce')
-        df['view_count'] = pd.to_numeric(df['view_count'], errors='coerce')
-        
-        # Calculate engagement (favorite_count / view_count)
-        df['engagement'] = df['favorite_count'] / df['view_count'].replace(0, 1)  # Avoid division by zero
-        df['engagement'] = df['engagement'].fillna(0)  # Fill NaN with 0
-        
-        # Sort by engagement descending
-        df = df.sort_values('engagement', ascending=False).reset_index(drop=True)
-        
-        return df
+        content = uploaded_file.getvalue()
+        return load_processed_data(content_hash(content), content)
+    except ValueError as e:
+        # Raised for missing required columns
+        st.error(str(e))
+        return None
     except Exception as e:
         st.error(f"Error loading file: {str(e)}")
         return None
 
+def compute_sort_index(df):
+    """Precompute row order for each sortable column in both directions, once per dataset"""
+    sort_index = {}
+    for col in SORT_COLUMNS:
+        values = df[col].reset_index(drop=True)
+        for ascending in (True, False):
+            # Stable sort with missing values last, matching DataFrame.sort_values
+            sort_index[(col, ascending)] = values.sort_values(ascending=ascending, kind='stable').index.to_numpy()
+    return sort_index
+
+def stream_chat_completion(client, **params):
+    """Yield text deltas from a streamed OpenAI chat completion"""
+    stream = client.chat.completions.create(stream=True, **params)
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+def lttb_indices(x, y, n_out):
+    """Pick n_out points that preserve the visual shape of a series (Largest-Triangle-Three-Buckets)"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    # First and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point, for the final bucket)
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # Keep the point forming the largest triangle with the previous pick and the next average
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    
+    return selected
+
+def prepare_chart_data(df, y_col, max_points=MAX_CHART_POINTS):
+    """Keep only charted columns, downsample to max_points over time, and truncate tooltip text"""
+    plot_df = df[['created_at', 'text', 'engagement', 'favorite_count', 'view_count']]
+    plot_df = plot_df.dropna(subset=['created_at', y_col]).sort_values('created_at', kind='stable')
+    
+    if len(plot_df) > max_points:
+        x = plot_df['created_at'].astype('int64').to_numpy(dtype=float)
+        y = plot_df[y_col].to_numpy(dtype=float)
+        plot_df = plot_df.iloc[lttb_indices(x, y, max_points)]
+    
+    plot_df = plot_df.copy()
+    text = plot_df['text'].fillna('')
+    plot_df['text'] = text.where(text.str.len() <= TOOLTIP_TEXT_CHARS, text.str.slice(0, TOOLTIP_TEXT_CHARS - 1) + '…')
+    return plot_df
+
 def create_engagement_plot(df):
     """Create scatter plot showing engagement over time"""
-    # Prepare data for plotting
-    plot_df = df.copy()
-    plot_df['created_at_str'] = plot_df['created_at'].dt.strftime('%Y-%m-%d')
+    # Prepare data for plotting (bounded number of points)
+    plot_df = prepare_chart_data(df, 'engagement')
     
     chart = alt.Chart(plot_df).mark_circle(size=100, opacity=0.6).encode(
         x=alt.X('created_at:T', title='Date Posted', axis=alt.Axis(format='%Y-%m-%d')),
@@ -179,9 +263,8 @@ def create_engagement_plot(df):
 
 def create_scatter_plot(df):
     """Create scatter plot with Altair showing favorite count over time"""
-    # Prepare data for plotting
-    plot_df = df.copy()
-    plot_df['created_at_str'] = plot_df['created_at'].dt.strftime('%Y-%m-%d')
+    # Prepare data for plotting (bounded number of points)
+    plot_df = prepare_chart_data(df, 'favorite_count')
     
     chart = alt.Chart(plot_df).mark_circle(size=100, opacity=0.6).encode(
         x=alt.X('created_at:T', title='Date Posted', axis=alt.Axis(format='%Y-%m-%d')),
@@ -204,35 +287,30 @@ def create_scatter_plot(df):
     
     return chart
 
-def analyze_vibe(df):
-    """Send tweets to OpenAI for analysis"""
-    openai_api_key = os.getenv('OPENAI_API_KEY')
-    
-    if not openai_api_key:
-        st.error("OPENAI_API_KEY not found in .env file. Please add it.")
-        return None
+@st.cache_data(max_entries=16, show_spinner=False)
+def tweet_line_tokens(data_hash, _df, columns, model):
+    """Token count of each tweet's prompt line, computed once per dataset, column set and tokenizer"""
+    return count_tokens(tweet_lines(_df, columns), model=model)
+
+def tweet_context(df, token_budget, columns, model, data_hash=None):
+    """
+    Engagement-stratified TSV sample of the tweets that fits the token budget.
+    With the dataset's `data_hash` (script thread only), token counts are reused from the Streamlit cache;
+    without it they are counted here, so background jobs never call into Streamlit.
+    """
+    line_tokens = tweet_line_tokens(data_hash, df, columns, model) if data_hash is not None else None
+    return build_tweet_context(df, token_budget, columns=columns, model=model, line_tokens=line_tokens)
+
+def vibe_request(df, data_hash=None):
+    """Build the chat completion parameters of the marketing analysis (pass data_hash only from the script thread)"""
+    # Prepare data for analysis - an engagement-stratified sample that fits the token budget
+    tweets_tsv, _ = tweet_context(df, VIBE_TWEET_TOKENS, columns=('favorite_count', 'text'), model="gpt-4", data_hash=data_hash)
     
-    try:
-        # Prepare data for analysis - take top tweets and sample
-        analysis_df = df[['text', 'favorite_count']].copy()
-        
-        # Create a summary of the data
-        sample_size = min(50, len(analysis_df))
-        sample_df = analysis_df.head(sample_size)
-        
-        # Format tweets for analysis
-        tweets_data = []
-        for idx, row in sample_df.iterrows():
-            tweets_data.append({
-                'text': row['text'],
-                'favorite_count': int(row['favorite_count'])
-            })
-        
-        # Create prompt
-        prompt = f"""Analyze the following Twitter/X posts and their engagement metrics. Provide a professional marketing report.
+    # Create prompt
+    prompt = f"""Analyze the following Twitter/X posts and their engagement metrics. Provide a professional marketing report.
 
-Here are the tweets with their favorite counts:
-{str(tweets_data)}
+Here are the tweets with their favorite counts (tab-separated, one tweet per line):
+{tweets_tsv}
 
 CRITICAL: Return ONLY valid HTML code in this EXACT format. Do NOT use markdown. Do NOT wrap in code blocks. Start directly with the HTML tags below:
 
@@ -251,46 +329,41 @@ CRITICAL: Return ONLY valid HTML code in this EXACT format. Do NOT use markdown.
 
 Return ONLY the HTML code above with your analysis filled in. Use <p>, <strong>, <em>, <ul>, <li> tags as needed. No markdown, no code blocks, just pure HTML."""
 
-        # Call OpenAI API
-        client = openai.OpenAI(api_key=openai_api_key)
-        
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a professional social media marketing analyst. You MUST return ONLY valid HTML code. Never use markdown syntax. Never wrap your response in code blocks. Always return pure HTML that can be directly rendered in a browser."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=2000
-        )
-        
-        return response.choices[0].message.content
-        
-    except Exception as e:
-        st.error(f"Error analyzing tweets: {str(e)}")
-        return None
+    return dict(
+        model="gpt-4",
+        messages=[
+            {"role": "system", "content": "You are a professional social media marketing analyst. You MUST return ONLY valid HTML code. Never use markdown syntax. Never wrap your response in code blocks. Always return pure HTML that can be directly rendered in a browser."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.7,
+        max_tokens=2000
+    )
 
-def analyze_personality(df):
-    """Analyze personality traits from tweets and return scores for radar plot"""
+def analyze_vibe(df):
+    """Send tweets to OpenAI for analysis, yielding the HTML report as it streams in"""
     openai_api_key = os.getenv('OPENAI_API_KEY')
     
     if not openai_api_key:
         st.error("OPENAI_API_KEY not found in .env file. Please add it.")
-        return None
+        return
     
     try:
-        # Prepare data for analysis - take sample of tweets
-        analysis_df = df[['text']].copy()
-        sample_size = min(50, len(analysis_df))
-        sample_df = analysis_df.head(sample_size)
-        
-        # Combine all tweet texts
-        all_tweets = "\n".join([f"- {text}" for text in sample_df['text'].tolist()])
+        # Call OpenAI API (shared client keeps connections warm across calls and reruns)
+        client = get_openai_client(openai_api_key)
+        yield from stream_chat_completion(client, **vibe_request(df, st.session_state.data_hash))
         
-        # Create prompt for personality analysis
-        prompt = f"""Analyze the personality traits of the author based on these Twitter/X posts. Rate each trait on a scale of 0-100.
+    except Exception as e:
+        st.error(f"Error analyzing tweets: {str(e)}")
 
-Tweets:
+def personality_request(df, data_hash=None):
+    """Build the chat completion parameters of the personality analysis (pass data_hash only from the script thread)"""
+    # Prepare data for analysis - an engagement-stratified sample that fits the token budget
+    all_tweets, _ = tweet_context(df, PERSONALITY_TWEET_TOKENS, columns=('text',), model="gpt-4o", data_hash=data_hash)
+    
+    # Create prompt for personality analysis
+    prompt = f"""Analyze the personality traits of the author based on these Twitter/X posts. Rate each trait on a scale of 0-100.
+
+Tweets (one per line):
 {all_tweets}
 
 Return ONLY a valid JSON object with these exact personality traits and their scores (0-100):
@@ -309,19 +382,29 @@ Also include a "summary" field with a brief Myers-Briggs style personality descr
 
 Return ONLY the JSON, no markdown, no code blocks, no explanations."""
 
-        # Call OpenAI API
-        client = openai.OpenAI(api_key=openai_api_key)
-        
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a personality psychologist. You MUST return ONLY valid JSON. Never use markdown. Never wrap your response in code blocks. Always return pure JSON that can be directly parsed."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=500,
-            response_format={"type": "json_object"}
-        )
+    return dict(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": "You are a personality psychologist. You MUST return ONLY valid JSON. Never use markdown. Never wrap your response in code blocks. Always return pure JSON that can be directly parsed."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.7,
+        max_tokens=500,
+        response_format={"type": "json_object"}
+    )
+
+def analyze_personality(df):
+    """Analyze personality traits from tweets and return scores for radar plot"""
+    openai_api_key = os.getenv('OPENAI_API_KEY')
+    
+    if not openai_api_key:
+        st.error("OPENAI_API_KEY not found in .env file. Please add it.")
+        return None
+    
+    try:
+        # Call OpenAI API (shared client keeps connections warm across calls and reruns)
+        client = get_openai_client(openai_api_key)
+        response = client.chat.completions.create(**personality_request(df, st.session_state.data_hash))
         
         result = json.loads(response.choices[0].message.content)
         return result
@@ -377,41 +460,24 @@ def create_radar_plot(personality_data):
     
     return fig
 
-def generate_tweet(df):
-    """Generate a tweet using AI based on user's writing style and engagement patterns"""
-    openai_api_key = os.getenv('OPENAI_API_KEY')
+def tweet_request(df, data_hash=None):
+    """Build the chat completion parameters of the tweet generator (pass data_hash only from the script thread)"""
+    # Prepare data for analysis - an engagement-stratified sample that fits the token budget
+    tweets_with_engagement, _ = tweet_context(df, GENERATE_TWEET_TOKENS, columns=('favorite_count', 'text'), model="gpt-4o", data_hash=data_hash)
     
-    if not openai_api_key:
-        st.error("OPENAI_API_KEY not found in .env file. Please add it.")
-        return None
+    # Get current date and time
+    current_datetime = datetime.now()
+    current_date_str = current_datetime.strftime('%Y-%m-%d')
+    current_time_str = current_datetime.strftime('%H:%M')
+    day_of_week = current_datetime.strftime('%A')
     
-    try:
-        # Prepare data for analysis - take sample of tweets
-        analysis_df = df[['text', 'favorite_count']].copy()
-        sample_size = min(30, len(analysis_df))
-        sample_df = analysis_df.head(sample_size)
-        
-        # Get current date and time
-        current_datetime = datetime.now()
-        current_date_str = current_datetime.strftime('%Y-%m-%d')
-        current_time_str = current_datetime.strftime('%H:%M')
-        day_of_week = current_datetime.strftime('%A')
-        
-        # Combine tweet texts with their engagement scores
-        tweets_with_engagement = []
-        for idx, row in sample_df.iterrows():
-            tweets_with_engagement.append({
-                'text': row['text'],
-                'favorite_count': int(row['favorite_count'])
-            })
-        
-        # Create prompt
-        prompt = f"""Based on the following Twitter/X posts and their engagement metrics (favorite_count), generate a new tweet that this person would likely post.
+    # Create prompt
+    prompt = f"""Based on the following Twitter/X posts and their engagement metrics (favorite_count), generate a new tweet that this person would likely post.
 
 Current date and time: {current_date_str} {current_time_str} ({day_of_week})
 
-Previous tweets with engagement:
-{json.dumps(tweets_with_engagement, indent=2)}
+Previous tweets with engagement (tab-separated, one tweet per line):
+{tweets_with_engagement}
 
 Generate a tweet that:
 1. Matches this person's writing style, tone, and voice
@@ -421,32 +487,167 @@ Generate a tweet that:
 
 CRITICAL: Return ONLY the tweet text itself. Nothing else. No explanations, no quotes, no markdown formatting, no code blocks, no prefixes, no suffixes. Just the raw tweet text and nothing more."""
 
-        # Call OpenAI API
-        client = openai.OpenAI(api_key=openai_api_key)
-        
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a social media content generator. You MUST return ONLY the tweet text. No markdown, no quotes, no explanations, no code blocks, no prefixes, no suffixes. Just the raw tweet text and absolutely nothing else."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.8,
-            max_tokens=280
-        )
+    return dict(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": "You are a social media content generator. You MUST return ONLY the tweet text. No markdown, no quotes, no explanations, no code blocks, no prefixes, no suffixes. Just the raw tweet text and absolutely nothing else."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.8,
+        max_tokens=280
+    )
+
+def generate_tweet(df):
+    """Generate a tweet using AI based on user's writing style and engagement patterns, yielding it as it streams in"""
+    openai_api_key = os.getenv('OPENAI_API_KEY')
+    
+    if not openai_api_key:
+        st.error("OPENAI_API_KEY not found in .env file. Please add it.")
+        return
+    
+    try:
+        # Call OpenAI API (shared client keeps connections warm across calls and reruns)
+        client = get_openai_client(openai_api_key)
+        yield from stream_chat_completion(client, **tweet_request(df, st.session_state.data_hash))
         
-        tweet_text = response.choices[0].message.content.strip()
-        # Remove quotes, markdown code blocks, and any other formatting
-        tweet_text = tweet_text.strip('"').strip("'").strip()
-        tweet_text = re.sub(r'^```.*?\n', '', tweet_text, flags=re.DOTALL)
-        tweet_text = re.sub(r'\n```.*?$', '', tweet_text, flags=re.DOTALL)
-        tweet_text = tweet_text.strip()
+    except Exception as e:
+        st.error(f"Error generating tweet: {str(e)}")
+
+def generate_tweet_candidates(df, model, n=5):
+    """Generate n tweets in one request and rank them by the engagement the local model predicts"""
+    openai_api_key = os.getenv('OPENAI_API_KEY')
+    
+    if not openai_api_key:
+        st.error("OPENAI_API_KEY not found in .env file. Please add it.")
+        return None
+    
+    try:
+        # One request returns all candidates as separate choices
+        client = get_openai_client(openai_api_key)
+        response = client.chat.completions.create(**tweet_request(df, st.session_state.data_hash), n=n)
+        candidates = list(dict.fromkeys(
+            clean_tweet_text(choice.message.content or "") for choice in response.choices
+        ))
+        candidates = [candidate for candidate in candidates if candidate]
+        if not candidates:
+            return None
         
-        return tweet_text
+        # One batched embedding request, then a single vectorized scoring pass
+        predicted = model.predict(Embedder(openai_api_key).get_embeddings(candidates))
+        order = np.argsort(-predicted, kind='stable')
+        return [(candidates[i], float(predicted[i])) for i in order]
         
     except Exception as e:
-        st.error(f"Error generating tweet: {str(e)}")
+        st.error(f"Error generating tweet candidates: {str(e)}")
         return None
 
+def clean_tweet_text(tweet_text):
+    """Remove quotes, markdown code blocks, and any other formatting from a generated tweet"""
+    tweet_text = tweet_text.strip()
+    tweet_text = tweet_text.strip('"').strip("'").strip()
+    tweet_text = re.sub(r'^```.*?\n', '', tweet_text, flags=re.DOTALL)
+    tweet_text = re.sub(r'\n```.*?$', '', tweet_text, flags=re.DOTALL)
+    return tweet_text.strip()
+
+def format_analysis_html(html_content):
+    """Clean the marketing report HTML and wrap it in the styled report container"""
+    html_content = html_content.strip()
+    
+    # Remove markdown code blocks (```html or ```)
+    html_content = re.sub(r'```html?\s*\n?', '', html_content)
+    html_content = re.sub(r'```\s*\n?', '', html_content)
+    html_content = html_content.strip()
+    
+    # If the content doesn't start with HTML tags, OpenAI might have returned markdown
+    # Try to convert common markdown to HTML
+    if html_content and not html_content.startswith('<'):
+        # Convert markdown headers to HTML
+        html_content = re.sub(r'^# (.+)$', r'<h1>\1</h1>', html_content, flags=re.MULTILINE)
+        html_content = re.sub(r'^## (.+)$', r'<h2>\1</h2>', html_content, flags=re.MULTILINE)
+        html_content = re.sub(r'^### (.+)$', r'<h3>\1</h3>', html_content, flags=re.MULTILINE)
+        html_content = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html_content)
+        html_content = re.sub(r'\*(.+?)\*', r'<em>\1</em>', html_content)
+        # Convert line breaks to paragraphs
+        paragraphs = [p.strip() for p in html_content.split('\n\n') if p.strip()]
+        html_content = '\n'.join([f'<p>{p}</p>' if not p.startswith('<') else p for p in paragraphs])
+    
+    # Wrap in styled container
+    return f"""
+    <div style="background-color: #ffffff; padding: 2rem; border-radius: 0.5rem; box-shadow: 0 2px 4px rgba(0,0,0,0.1); margin-top: 1rem; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #333;">
+        {html_content}
+    </div>
+    """
+
+@st.cache_resource(show_spinner=False)
+def get_analysis_jobs():
+    """One job runner per server process, so sessions viewing the same dataset share running and finished analyses"""
+    return BackgroundJobs(ResponseCache(ANALYSIS_CACHE_PATH), max_workers=3)
+
+def analysis_key(name, data_hash):
+    """Cache key of one analysis of one dataset"""
+    return ResponseCache.make_key(analysis=name, dataset=data_hash, prompt_version=ANALYSIS_PROMPT_VERSION)
+
+def run_analysis(name, df, openai_api_key):
+    """Run one analysis to completion; called from a background thread, so it must not use Streamlit"""
+    client = get_openai_client(openai_api_key)
+    response = client.chat.completions.create(**ANALYSIS_REQUESTS[name](df))
+    content = response.choices[0].message.content
+    if name == "personality":
+        return json.loads(content)
+    if name == "tweet":
+        return clean_tweet_text(content) or None
+    return content
+
+def start_analyses(df, data_hash):
+    """Start every analysis of a newly loaded dataset in the background; cached ones finish immediately"""
+    openai_api_key = os.getenv('OPENAI_API_KEY')
+    if not openai_api_key:
+        return
+    jobs = get_analysis_jobs()
+    for name in ANALYSIS_REQUESTS:
+        jobs.submit(analysis_key(name, data_hash), run_analysis, name, df, openai_api_key)
+
+def get_analysis_result(name, spinner_text):
+    """Return the result of an analysis of the current dataset, waiting if it is still running"""
+    future = get_analysis_jobs().get(analysis_key(name, st.session_state.data_hash))
+    if future is None:
+        return None
+    try:
+        if not future.done():
+            with st.spinner(spinner_text):
+                return future.result()
+        return future.result()
+    except Exception as e:
+        st.error(f"Background analysis failed: {str(e)}")
+        return None
+
+def save_analysis_result(name, result):
+    """Store the result of an analysis run from a button, replacing the cached one"""
+    get_analysis_jobs().set(analysis_key(name, st.session_state.data_hash), result)
+
+@st.cache_resource(show_spinner=False)
+def get_tweet_index():
+    """Open the persistent tweet embedding index once per server process"""
+    return TweetIndex(TWEET_INDEX_DIR)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def dataset_tweet_keys(data_hash, _df):
+    """Index key of each tweet of a dataset, computed once per dataset"""
+    return [text_key(text) for text in _df['text'].fillna('')]
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_engagement_model(data_hash, _df):
+    """Fit the engagement predictor on a dataset's indexed embeddings, once per dataset"""
+    vectors = get_tweet_index().get_vectors(dataset_tweet_keys(data_hash, _df))
+    return EngagementPredictor().fit(vectors, _df['engagement'].to_numpy())
+
+# Chat completion parameters of each AI analysis, by name
+ANALYSIS_REQUESTS = {
+    "vibe": vibe_request,
+    "personality": personality_request,
+    "tweet": tweet_request,
+}
+
 # Main app
 st.markdown('<p class="main-header">📊 Tweet Analytics Dashboard</p>', unsafe_allow_html=True)
 st.markdown('<p class="sub-header">Upload your tweet data and gain insights into your engagement patterns</p>', unsafe_allow_html=True)
@@ -463,8 +664,23 @@ with st.sidebar:
     if uploaded_file is not None:
         if st.session_state.df is None or st.button("Reload Data"):
             st.session_state.df = load_data(uploaded_file)
-            st.session_state.analysis_done = False
-            st.session_state.personality_done = False
+            st.session_state.sort_index = None
+            st.session_state.data_hash = None
+    
+    # Load one or more accounts from the repository's TwExportly corpus
+    corpus_accounts = sorted({
+        parsed[0] for parsed in map(parse_export_filename, os.listdir(CORPUS_DIR) if os.path.isdir(CORPUS_DIR) else [])
+        if parsed is not None
+    })
+    if corpus_accounts:
+        with st.expander("📚 Or load from data/TwExportly"):
+            selected_accounts = st.multiselect("Accounts", corpus_accounts)
+            if selected_accounts and st.button("Load Accounts"):
+                with st.spinner("Loading corpus..."):
+                    corpus = load_corpus(CORPUS_DIR)
+                st.session_state.df = corpus[corpus['account'].isin(selected_accounts)].reset_index(drop=True)
+                st.session_state.sort_index = None
+                st.session_state.data_hash = None
     
     st.divider()
     
@@ -476,7 +692,8 @@ with st.sidebar:
             "📈 Engagement Chart",
             "🔍 Marketing Analysis",
             "🧠 Personality Profile",
-            "✍️ Generate Tweet"
+            "✍️ Generate Tweet",
+            "🔎 Similar Tweets"
         ]
         
         selected = st.radio(
@@ -489,7 +706,8 @@ with st.sidebar:
 
 # Main content area
 if st.session_state.df is not None:
-    df = st.session_state.df.copy()
+    # No copy: every function below selects or copies the columns it changes
+    df = st.session_state.df
     
     # Ensure engagement column exists (for backward compatibility)
     if 'engagement' not in df.columns:
@@ -498,6 +716,16 @@ if st.session_state.df is not None:
         # Re-sort by engagement
         df = df.sort_values('engagement', ascending=False).reset_index(drop=True)
         st.session_state.df = df
+        st.session_state.sort_index = None
+        st.session_state.data_hash = None
+    
+    if st.session_state.sort_index is None:
+        st.session_state.sort_index = compute_sort_index(df)
+    
+    # Start the AI analyses as soon as a dataset is loaded, so the tabs are ready when opened
+    if st.session_state.data_hash is None:
+        st.session_state.data_hash = frame_hash(df)
+        start_analyses(df, st.session_state.data_hash)
     
     selected_tab = st.session_state.selected_tab
     
@@ -528,7 +756,7 @@ if st.session_state.df is not None:
         with col_sort1:
             sort_column = st.selectbox(
                 "Sort by:",
-                options=['engagement', 'favorite_count', 'view_count', 'created_at'],
+                options=SORT_COLUMNS,
                 format_func=lambda x: {
                     'engagement': 'Engagement Rate',
                     'favorite_count': 'Favorite Count',
@@ -548,12 +776,13 @@ if st.session_state.df is not None:
                 key="sort_order"
             )
         
-        # Sort the dataframe
+        # Sort the dataframe by gathering rows in the precomputed order
         ascending = (sort_order == 'Ascending')
-        df_sorted = df.sort_values(sort_column, ascending=ascending).reset_index(drop=True)
+        row_order = st.session_state.sort_index[(sort_column, ascending)]
+        df_sorted = df[['text', 'created_at', 'engagement', 'favorite_count', 'view_count']].take(row_order)
         
         st.dataframe(
-            df_sorted[['text', 'created_at', 'engagement', 'favorite_count', 'view_count']],
+            df_sorted,
             use_container_width=True,
             height=600,
             hide_index=True,
@@ -586,6 +815,8 @@ if st.session_state.df is not None:
     # Engagement Chart Tab
     elif selected_tab == "📈 Engagement Chart":
         st.header("📈 Engagement Analysis")
+        if len(df) > MAX_CHART_POINTS:
+            st.caption(f"Showing a representative sample of {MAX_CHART_POINTS:,} of {len(df):,} tweets per chart.")
         
         # Engagement Rate Plot (first)
         st.subheader("Engagement Rate Over Time")
@@ -607,43 +838,21 @@ if st.session_state.df is not None:
         st.markdown("Get professional insights about your persona, writing style, and engagement patterns.")
         
         if st.button("Analyze My Vibe", type="primary", use_container_width=True):
-            with st.spinner("Analyzing your tweets with AI... This may take a moment."):
-                analysis_result = analyze_vibe(df)
-                
-                if analysis_result:
-                    st.session_state.analysis_done = True
-                    st.session_state.analysis_result = analysis_result
-        
-        if st.session_state.analysis_done and 'analysis_result' in st.session_state:
-            # Clean HTML - remove markdown code blocks if present
-            html_content = st.session_state.analysis_result.strip()
-            
-            # Remove markdown code blocks (```html or ```)
-            html_content = re.sub(r'```html?\s*\n?', '', html_content)
-            html_content = re.sub(r'```\s*\n?', '', html_content)
-            html_content = html_content.strip()
+            # Render the report as it streams in. st.write_stream would escape the HTML,
+            # so the partial report is re-rendered into a placeholder instead.
+            report_placeholder = st.empty()
+            analysis_result = ""
+            for delta in analyze_vibe(df):
+                analysis_result += delta
+                report_placeholder.markdown(format_analysis_html(analysis_result), unsafe_allow_html=True)
+            report_placeholder.empty()
             
-            # If the content doesn't start with HTML tags, OpenAI might have returned markdown
-            # Try to convert common markdown to HTML
-            if not html_content.startswith('<'):
-                # Convert markdown headers to HTML
-                html_content = re.sub(r'^# (.+)$', r'<h1>\1</h1>', html_content, flags=re.MULTILINE)
-                html_content = re.sub(r'^## (.+)$', r'<h2>\1</h2>', html_content, flags=re.MULTILINE)
-                html_content = re.sub(r'^### (.+)$', r'<h3>\1</h3>', html_content, flags=re.MULTILINE)
-                html_content = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html_content)
-                html_content = re.sub(r'\*(.+?)\*', r'<em>\1</em>', html_content)
-                # Convert line breaks to paragraphs
-                paragraphs = [p.strip() for p in html_content.split('\n\n') if p.strip()]
-                html_content = '\n'.join([f'<p>{p}</p>' if not p.startswith('<') else p for p in paragraphs])
-            
-            # Wrap in styled container
-            styled_html = f"""
-            <div style="background-color: #ffffff; padding: 2rem; border-radius: 0.5rem; box-shadow: 0 2px 4px rgba(0,0,0,0.1); margin-top: 1rem; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #333;">
-                {html_content}
-            </div>
-            """
-            
-            st.markdown(styled_html, unsafe_allow_html=True)
+            if analysis_result:
+                save_analysis_result("vibe", analysis_result)
+        
+        analysis_result = get_analysis_result("vibe", "Analyzing your tweets in the background...")
+        if analysis_result:
+            st.markdown(format_analysis_html(analysis_result), unsafe_allow_html=True)
         else:
             st.info("👆 Click the button above to generate your marketing analysis report.")
     
@@ -657,11 +866,10 @@ if st.session_state.df is not None:
                 personality_result = analyze_personality(df)
                 
                 if personality_result:
-                    st.session_state.personality_done = True
-                    st.session_state.personality_data = personality_result
+                    save_analysis_result("personality", personality_result)
         
-        if st.session_state.personality_done and 'personality_data' in st.session_state:
-            personality_data = st.session_state.personality_data
+        personality_data = get_analysis_result("personality", "Analyzing personality traits in the background...")
+        if personality_data:
             
             # Display radar plot
             radar_fig = create_radar_plot(personality_data)
@@ -694,13 +902,42 @@ if st.session_state.df is not None:
         
         # 1. The Button
         if st.button("Generate Tweet", type="primary", use_container_width=True):
-            with st.spinner("Generating your tweet..."):
-                tweet_text = generate_tweet(df)
-                if tweet_text:
-                    st.session_state.generated_tweet = tweet_text
+            # Stream the tweet as it is written, then show it in the preview card below
+            stream_placeholder = st.empty()
+            with stream_placeholder.container():
+                tweet_text = st.write_stream(generate_tweet(df))
+            stream_placeholder.empty()
+            
+            if isinstance(tweet_text, str) and clean_tweet_text(tweet_text):
+                save_analysis_result("tweet", clean_tweet_text(tweet_text))
+        
+        # Ranking needs the embeddings of this dataset's tweets from the Similar Tweets search index
+        index = get_tweet_index()
+        index_ready = all(key in index for key in dataset_tweet_keys(st.session_state.data_hash, df))
+        col_n, col_rank = st.columns([1, 3])
+        with col_n:
+            n_candidates = st.number_input("Candidates", min_value=2, max_value=10, value=5)
+        with col_rank:
+            st.write("")
+            rank_clicked = st.button("Generate & Rank Candidates", use_container_width=True, disabled=not index_ready)
+        if not index_ready:
+            st.caption("Build the search index in 🔎 Similar Tweets to rank candidates by predicted engagement.")
+        
+        if rank_clicked:
+            with st.spinner(f"Generating and scoring {int(n_candidates)} tweets..."):
+                model = get_engagement_model(st.session_state.data_hash, df)
+                candidates = generate_tweet_candidates(df, model, n=int(n_candidates))
+            if candidates:
+                save_analysis_result("tweet", candidates[0][0])
+                st.session_state.tweet_candidates = (st.session_state.data_hash, candidates)
+        
+        candidates = None
+        if st.session_state.tweet_candidates and st.session_state.tweet_candidates[0] == st.session_state.data_hash:
+            candidates = st.session_state.tweet_candidates[1]
         
         # 2. The Display (Native Streamlit Components)
-        if st.session_state.get("generated_tweet"):
+        generated_tweet = get_analysis_result("tweet", "Drafting a tweet in the background...")
+        if generated_tweet:
             st.markdown("### Preview")
             
             # Center the content with columns to constrain width
@@ -722,13 +959,91 @@ if st.session_state.df is not None:
                         
                         # The Tweet Text
                         # We use st.write to handle newlines automatically
-                        st.write(st.session_state.generated_tweet)
+                        st.write(generated_tweet)
                         
                         # Fake Interaction Icons (Just text for vibes)
                         st.caption("💬 24  🔁 12  ❤️ 158  📊 12K")
+                
+                if candidates and candidates[0][0] == generated_tweet:
+                    st.caption(
+                        f"📈 Predicted engagement: {candidates[0][1]:.4f} "
+                        f"(median of your tweets: {df['engagement'].median():.4f})"
+                    )
+            
+            if candidates and candidates[0][0] == generated_tweet:
+                with st.expander(f"All {len(candidates)} candidates"):
+                    st.dataframe(
+                        pd.DataFrame(candidates, columns=['text', 'predicted_engagement']),
+                        use_container_width=True,
+                        hide_index=True,
+                        column_config={
+                            "text": st.column_config.TextColumn("Tweet Text", width="large"),
+                            "predicted_engagement": st.column_config.NumberColumn("Predicted Engagement", format="%.4f")
+                        }
+                    )
             
         else:
             st.info("👆 Click the button above to generate a tweet.")
+    
+    # Similar Tweets Tab
+    elif selected_tab == "🔎 Similar Tweets":
+        st.header("🔎 Similar Tweets")
+        st.markdown("Find the tweets whose meaning is closest to one of your top performers.")
+        
+        index = get_tweet_index()
+        tweet_keys = dataset_tweet_keys(st.session_state.data_hash, df)
+        missing = sum(key not in index for key in set(tweet_keys))
+        
+        if missing:
+            st.info(f"{missing:,} tweets of this dataset are not in the search index yet. Indexing embeds only those tweets.")
+            if st.button("Build Search Index", type="primary", use_container_width=True):
+                openai_api_key = os.getenv('OPENAI_API_KEY')
+                if not openai_api_key:
+                    st.error("OPENAI_API_KEY not found in .env file. Please add it.")
+                else:
+                    try:
+                        with st.spinner(f"Embedding {missing:,} tweets..."):
+                            index.add_texts(Embedder(openai_api_key), df['text'].fillna('').tolist(), keys=tweet_keys)
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error building the search index: {str(e)}")
+        else:
+            # The dataset is sorted by engagement, so its head holds the top performers
+            top_rows = list(range(min(50, len(df))))
+            col_query, col_k = st.columns([4, 1])
+            with col_query:
+                query_row = st.selectbox(
+                    "Top performer:",
+                    options=top_rows,
+                    format_func=lambda i: f"{int(df['favorite_count'].iloc[i]):,} ❤️  {str(df['text'].iloc[i])[:120]}"
+                )
+            with col_k:
+                k = st.number_input("Results", min_value=1, max_value=50, value=10)
+            
+            # Search only this dataset's tweets; the query itself is dropped from the results
+            dataset_rows = np.unique(index.positions(tweet_keys))
+            subset = None if len(dataset_rows) == len(index) else dataset_rows
+            query_key = tweet_keys[query_row]
+            result_keys, scores = index.search(index.get_vectors([query_key])[0], k=int(k) + 1, subset=subset)
+            
+            first_row = {}
+            for row, key in enumerate(tweet_keys):
+                first_row.setdefault(key, row)
+            results = [(first_row[key], score) for key, score in zip(result_keys, scores) if key != query_key][:int(k)]
+            
+            similar_df = df[['text', 'favorite_count', 'engagement']].iloc[[row for row, _ in results]].copy()
+            similar_df.insert(0, 'similarity', [score for _, score in results])
+            st.dataframe(
+                similar_df,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "similarity": st.column_config.NumberColumn("Similarity", format="%.3f"),
+                    "text": st.column_config.TextColumn("Tweet Text", width="large"),
+                    "favorite_count": st.column_config.NumberColumn("Favorites", format="%d"),
+                    "engagement": st.column_config.NumberColumn("Engagement", format="%.4f")
+                }
+            )
 else:
     st.info("👈 Please upload a CSV file using the sidebar to get started.")
     st.markdown("""
@@ -0,0 +1,433 @@
+import asyncio
+import traceback
+import numpy as np
+from scripts.genai import GenAI
+from scripts.image_requests import image_request_sizes, image_results
+from scripts.response_cache import ResponseCache
+from scripts.image_prep import prepare_images
+from scripts.openai_clients import get_async_openai_client
+from scripts.rate_limiter import get_scheduler
+from scripts.embeddings import embedding_batches, embedding_inputs
+
+
+class AsyncGenAI(GenAI):
+    """
+    An asynchronous variant of GenAI built on `openai.AsyncOpenAI`.
+
+    Every method that calls the OpenAI API is a coroutine with the same name and parameters
+    as in GenAI, so many requests can run concurrently, e.g. with `asyncio.gather`. The client
+    comes from the process-wide pool in `scripts.openai_clients`, so all instances on the same
+    event loop share one warm connection pool. Requests go through the same rate limit scheduler
+    as GenAI, so they are paced and retried, and waits do not block the event loop. Helpers that
+    do not call the API (reading documents, extracting frames, display functions) are inherited
+    from GenAI unchanged.
+
+    Example:
+    -------
+    >>> ai = AsyncGenAI(openai_api_key)
+    >>> async def main():
+    ...     return await asyncio.gather(*(ai.generate_text(p) for p in prompts))
+    >>> responses = asyncio.run(main())
+    """
+
+    def __init__(self, openai_api_key, cache=None, scheduler=None):
+        """
+        Initializes the AsyncGenAI class with the provided OpenAI API key.
+
+        Parameters:
+        ----------
+        openai_api_key : str
+            The API key for accessing OpenAI's services.
+        cache : ResponseCache or str, optional
+            A `ResponseCache` instance, or a path to a SQLite file to open one at.
+            When set, identical `generate_text` calls are served from disk. Defaults to None (no caching).
+        scheduler : RateLimitScheduler, optional
+            Rate limit scheduler for API requests. Defaults to the process-wide one from `get_scheduler()`,
+            so async and sync instances share the same per-model budgets.
+        """
+        # GenAI.__init__ is not called: it would create a blocking client, and `client` is a property here
+        self.openai_api_key = openai_api_key
+        if isinstance(cache, str):
+            cache = ResponseCache(cache)
+        self.cache = cache
+        self.scheduler = scheduler or get_scheduler()
+
+    @property
+    def client(self):
+        """
+        The shared `openai.AsyncOpenAI` client for the running event loop.
+        Its own retries are disabled: requests go through `scheduler`, which paces and retries them.
+        """
+        return get_async_openai_client(self.openai_api_key).with_options(max_retries=0)
+
+    async def _send(self, raw_method, **params):
+        """
+        Sends one OpenAI request through the rate limit scheduler without blocking the event loop. See `GenAI._send`.
+        """
+        rate_key = params.get("model", "default")
+        # Uploaded files are read by each attempt, so rewind them before a retry
+        file_positions = {name: value.tell() for name, value in params.items() if hasattr(value, "seek")}
+
+        async def send():
+            for name, position in file_positions.items():
+                params[name].seek(position)
+            raw_response = await raw_method(**params)
+            self.scheduler.update_from_headers(rate_key, raw_response.headers)
+            return raw_response.parse()
+
+        return await self.scheduler.call_async(rate_key, send, tokens=self._estimate_request_tokens(params))
+
+    async def generate_text(self, prompt, instructions='You are a helpful AI named Jarvis', model="gpt-4o-mini", output_type='text', temperature =1):
+        """
+        Generates a text completion using the OpenAI API. See `GenAI.generate_text`.
+
+        Returns:
+        -------
+        str
+            The AI-generated response.
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(
+                method="generate_text",
+                model=model,
+                instructions=instructions,
+                prompt=prompt,
+                temperature=temperature,
+                output_type=output_type,
+            )
+            cached_response = self.cache.get(cache_key)
+            if cached_response is not None:
+                return cached_response
+
+        completion = await self._send(self.client.chat.completions.with_raw_response.create,
+            model=model,
+            temperature=temperature,
+            response_format={"type": output_type},
+            messages=[
+                {"role": "system", "content": instructions},
+                {"role": "user", "content": prompt}
+            ]
+        )
+        response = completion.choices[0].message.content
+        response = response.replace("```html", "")
+        response = response.replace("```", "")
+
+        if cache_key is not None:
+            self.cache.set(cache_key, response)
+        return response
+
+    async def stream_text(self, prompt, instructions='You are a helpful AI named Jarvis', model="gpt-4o-mini", output_type='text', temperature =1):
+        """
+        Streams a text completion as an async iterator of text deltas. See `GenAI.stream_text`.
+
+        Yields:
+        ------
+        str
+            Text deltas of the response, in order.
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(
+                method="stream_text",
+                model=model,
+                instructions=instructions,
+                prompt=prompt,
+                temperature=temperature,
+                output_type=output_type,
+            )
+            cached_response = self.cache.get(cache_key)
+            if cached_response is not None:
+                yield cached_response
+                return
+
+        stream = await self._send(self.client.chat.completions.with_raw_response.create,
+            model=model,
+            temperature=temperature,
+            response_format={"type": output_type},
+            messages=[
+                {"role": "system", "content": instructions},
+                {"role": "user", "content": prompt}
+            ],
+            stream=True,
+        )
+        deltas = []
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                deltas.append(chunk.choices[0].delta.content)
+                yield deltas[-1]
+
+        if cache_key is not None:
+            self.cache.set(cache_key, "".join(deltas))
+
+    async def generate_chat_response(self, chat_history, user_message, instructions, model="gpt-4o-mini", output_type='text'):
+        """
+        Generates a chatbot-like response based on the conversation history. See `GenAI.generate_chat_response`.
+
+        Returns:
+        -------
+        str
+            The chatbot's response. `chat_history` is updated in place.
+        """
+        chat_history.append({"role": "user", "content": user_message})
+
+        completion = await self._send(self.client.chat.completions.with_raw_response.create,
+            model=model,
+            response_format={"type": output_type},
+            messages=[
+                {"role": "system", "content": instructions},
+                *chat_history
+            ]
+        )
+
+        bot_response = completion.choices[0].message.content
+        chat_history.append({"role": "assistant", "content": bot_response})
+
+        return bot_response
+
+    async def stream_chat_response(self, chat_history, user_message, instructions, model="gpt-4o-mini", output_type='text'):
+        """
+        Streams a chatbot-like response as an async iterator of text deltas. See `GenAI.stream_chat_response`.
+
+        Yields:
+        ------
+        str
+            Text deltas of the chatbot's response, in order.
+        """
+        chat_history.append({"role": "user", "content": user_message})
+
+        stream = await self._send(self.client.chat.completions.with_raw_response.create,
+            model=model,
+            response_format={"type": output_type},
+            messages=[
+                {"role": "system", "content": instructions},
+                *chat_history
+            ],
+            stream=True,
+        )
+        deltas = []
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                deltas.append(chunk.choices[0].delta.content)
+                yield deltas[-1]
+
+        chat_history.append({"role": "assistant", "content": "".join(deltas)})
+
+    async def generate_image(self, prompt, model="dall-e-3", size="1024x1024", quality="standard", n=1, max_workers=4):
+        """
+        Generates images from a text prompt using the OpenAI DALL-E API. See `GenAI.generate_image`.
+
+        When `n` is more than the model accepts per request, the requests are sent concurrently,
+        with at most `max_workers` in flight.
+
+        Returns:
+        -------
+        tuple or list of tuple
+            (image_url, revised_prompt) for n=1, otherwise a list with one such tuple per image.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def request(count):
+            async with semaphore:
+                response_img = await self._send(self.client.images.with_raw_response.generate,
+                    model=model,
+                    prompt=prompt,
+                    size=size,
+                    quality=quality,
+                    n=count,
+                )
+            return image_results(response_img)
+
+        batches = await asyncio.gather(*(request(count) for count in image_request_sizes(n, model)))
+        images = [image for batch in batches for image in batch]
+
+        return images[0] if n == 1 else images
+
+    async def generate_image_description(self, image_paths, instructions, model = 'gpt-4o-mini',
+                                         max_edge=None, jpeg_quality=None, max_total_bytes=None):
+        """
+        Generates a description for one or more images. See `GenAI.generate_image_description`.
+
+        Returns:
+        -------
+        str
+            A textual description of the image(s).
+        """
+        if isinstance(image_paths, str):
+            image_paths = [image_paths]
+
+        # Reading and re-encoding images is blocking work, so keep it off the event loop
+        if max_edge is None and jpeg_quality is None and max_total_bytes is None:
+            base64_images = await asyncio.to_thread(lambda: [self.encode_image(path) for path in image_paths])
+        else:
+            base64_images, _ = await asyncio.to_thread(
+                prepare_images,
+                image_paths,
+                max_edge=max_edge,
+                jpeg_quality=jpeg_quality or 95,
+                max_total_bytes=max_total_bytes,
+            )
+        image_urls = [f"data:image/jpeg;base64,{base64_image}" for base64_image in base64_images]
+
+        PROMPT_MESSAGES = [
+            {
+                "role": "user",
+                "content": [{"type": "text", "text": instructions},
+                            *map(lambda x: {"type": "image_url", "image_url": {"url": x}}, image_urls),
+                            ],
+            },
+        ]
+        params = {
+            "model": model,
+            "messages": PROMPT_MESSAGES,
+            "max_tokens": 1000,
+        }
+
+        completion = await self._send(self.client.chat.completions.with_raw_response.create, **params)
+        response = completion.choices[0].message.content
+        response = response.replace("```html", "")
+        response = response.replace("```", "")
+        return response
+
+    async def generate_video_description(self, fname_video, instructions, max_samples=15, model='gpt-4o-mini',
+                                         max_edge=None, jpeg_quality=95, max_total_bytes=None):
+        """
+        Generates a textual description of a video by analyzing sampled frames. See `GenAI.generate_video_description`.
+
+        Returns
+        -------
+        str
+            A descriptive summary of the video content.
+        """
+        # Frame extraction decodes video, so run it in a worker thread
+        base64Frames_samples, nframes, fps = await asyncio.to_thread(
+            self.extract_frames,
+            fname_video,
+            max_samples,
+            max_edge=max_edge,
+            jpeg_quality=jpeg_quality,
+            max_total_bytes=max_total_bytes,
+        )
+        return await self.generate_frames_description(base64Frames_samples, instructions, model=model)
+
+    async def generate_frames_description(self, base64_frames, instructions, model='gpt-4o-mini'):
+        """
+        Generates a textual description of already-extracted video frames. See `GenAI.generate_frames_description`.
+
+        Returns
+        -------
+        str
+            A descriptive summary of the frames.
+        """
+        image_urls = [f"data:image/jpeg;base64,{base64_image}" for base64_image in base64_frames]
+
+        prompt_messages = [
+            {
+                "role": "user",
+                "content": [{"type": "text", "text": instructions}] +
+                        [{"type": "image_url", "image_url": {"url": url}} for url in image_urls],
+            },
+        ]
+
+        params = {
+            "model": model,
+            "messages": prompt_messages,
+            "max_tokens": 1000,
+        }
+
+        completion = await self._send(self.client.chat.completions.with_raw_response.create, **params)
+        response = completion.choices[0].message.content
+
+        return response.replace("```html", "").replace("```", "")
+
+    async def generate_audio(self, text, file_path, model='tts-1', voice='nova', speed=1.0):
+        """
+        Generates an audio file from the given text using OpenAI's text-to-speech model. See `GenAI.generate_audio`.
+
+        Returns
+        -------
+        bool
+            Returns True if the audio file is successfully generated and saved.
+        """
+        response = await self._send(self.client.audio.speech.with_raw_response.create,
+            model=model,
+            voice=voice,
+            input=text,
+            speed=speed
+        )
+
+        # The response body has already been read, so writing it does not touch the network
+        await asyncio.to_thread(response.write_to_file, file_path)
+
+        return True
+
+    async def recognize_speech(self, audio_filename, model = 'whisper-1'):
+        """
+        Transcribes an audio file with OpenAI's speech recognition model.
+
+        Returns
+        -------
+        str or None
+            The transcribed text, or None if transcription failed.
+        """
+        try:
+            with open(audio_filename, "rb") as audio_file:
+                transcription = await self._send(self.client.audio.transcriptions.with_raw_response.create,
+                    model=model,
+                    file=audio_file
+                )
+            return transcription.text
+        except Exception:
+            traceback.print_exc()
+            return None
+
+    async def get_embedding(self, text, model='text-embedding-3-small'):
+        """
+        Generates an embedding vector for a given text. See `GenAI.get_embedding`.
+
+        Returns:
+        -------
+        list
+            The embedding vector of the input text.
+        """
+        text = text.replace("\n", " ") or " "  # the API rejects empty strings
+        response = await self._send(self.client.embeddings.with_raw_response.create,
+            input=text,
+            model=model
+        )
+        return response.data[0].embedding
+
+    async def get_embeddings(self, texts, model='text-embedding-3-small', batch_size=256, max_tokens_per_batch=250000,
+                             max_concurrency=4):
+        """
+        Generates embedding vectors for many texts. See `GenAI.get_embeddings`.
+
+        Batches are sent concurrently, with at most `max_concurrency` requests in flight.
+
+        Returns:
+        -------
+        np.ndarray
+            A float32 matrix of shape (len(texts), embedding_dim), in input order.
+        """
+        texts = embedding_inputs(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        embeddings = [None] * len(texts)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def embed_batch(batch_start, batch):
+            async with semaphore:
+                response = await self._send(self.client.embeddings.with_raw_response.create,
+                    input=batch,
+                    model=model
+                )
+            for item in response.data:
+                embeddings[batch_start + item.index] = item.embedding
+
+        await asyncio.gather(*(
+            embed_batch(batch_start, batch)
+            for batch_start, batch in embedding_batches(texts, batch_size, max_tokens_per_batch)
+        ))
+
+        return np.asarray(embeddings, dtype=np.float32)
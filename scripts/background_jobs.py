@@ -0,0 +1,134 @@
+import itertools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class BackgroundJobs:
+    """
+    Runs keyed jobs on a thread pool and keeps their results in a persistent `ResponseCache`.
+
+    A job is identified by a cache key (e.g. built with `ResponseCache.make_key`). Submitting
+    a key whose result is already cached returns a completed future without running anything,
+    and submitting a key that is still running returns the in-flight future, so several callers
+    (e.g. Streamlit sessions sharing one instance) never pay for the same work twice.
+
+    A result stored with `set` supersedes a job still running for the same key: that job's result
+    is then discarded instead of overwriting the stored one.
+
+    Attributes:
+    ----------
+    cache : ResponseCache
+        Where finished results are stored. Results must be JSON-serializable.
+    """
+
+    def __init__(self, cache, max_workers=3):
+        """
+        Initializes the job runner.
+
+        Parameters:
+        ----------
+        cache : ResponseCache
+            Persistent store for job results.
+        max_workers : int, optional
+            Maximum number of jobs running at the same time (default 3).
+        """
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="background-job")
+        self._lock = threading.Lock()
+        self._futures = {}  # key -> Future of running or failed jobs; succeeded jobs are read from the cache
+        self._generation = itertools.count(1)
+        self._current = {}  # key -> generation of the job or `set` call whose result may be cached
+
+    def submit(self, key, fn, *args, force=False, **kwargs):
+        """
+        Starts `fn(*args, **kwargs)` in the background unless its result is cached or already running.
+
+        Parameters:
+        ----------
+        key : str
+            Cache key identifying the job.
+        fn : callable
+            The job. Its return value is cached unless it is None.
+        force : bool, optional
+            If True, ignore the cached result and run the job again (default: False).
+
+        Returns:
+        -------
+        concurrent.futures.Future
+            Resolves to the job's result, or raises the job's exception.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None and not future.done():
+                return future
+
+            if not force:
+                cached_result = self.cache.get(key)
+                if cached_result is not None:
+                    future = Future()
+                    future.set_result(cached_result)
+                    return future
+
+            generation = next(self._generation)
+            self._current[key] = generation
+            future = self._executor.submit(self._run, key, generation, fn, *args, **kwargs)
+            self._futures[key] = future
+
+        # Added outside the lock: the callback runs at once if the job already finished
+        future.add_done_callback(lambda done: self._prune(key, generation, done))
+        return future
+
+    def _run(self, key, generation, fn, *args, **kwargs):
+        """Runs one job and stores its result in the cache, unless `set` stored a newer result meanwhile."""
+        result = fn(*args, **kwargs)
+        with self._lock:
+            if result is not None and self._current.get(key) == generation:
+                self.cache.set(key, result)
+        return result
+
+    def _prune(self, key, generation, future):
+        """Forgets a finished job whose result is in the cache. Failed jobs are kept so `get` reports the error."""
+        if future.cancelled() or future.exception() is not None or future.result() is None:
+            return
+        with self._lock:
+            if self._futures.get(key) is future:
+                self._futures.pop(key)
+            if self._current.get(key) == generation:
+                self._current.pop(key)
+
+    def get(self, key):
+        """
+        Returns the future of a job started by this instance, or a completed future for a cached result.
+
+        Returns:
+        -------
+        concurrent.futures.Future or None
+            None if the job was never submitted and nothing is cached under `key`.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+        if future is not None:
+            return future
+
+        cached_result = self.cache.get(key)
+        if cached_result is None:
+            return None
+        future = Future()
+        future.set_result(cached_result)
+        return future
+
+    def set(self, key, result):
+        """
+        Stores a result computed outside the runner (e.g. by a streamed foreground call) under `key`.
+
+        A job still running for `key` is superseded: its result is not cached, and `get` returns
+        a completed future with `result` from now on.
+        """
+        with self._lock:
+            self._current[key] = next(self._generation)
+            self.cache.set(key, result)
+            self._futures.pop(key, None)
+
+    def shutdown(self, wait=True):
+        """Stops accepting jobs and, if `wait`, waits for running jobs to finish."""
+        self._executor.shutdown(wait=wait)
@@ -1,8 +1,10 @@
 import openai
 from IPython.display import display, Image, HTML, Audio
 import base64
-import requests
-import time 
+from concurrent.futures import ThreadPoolExecutor
+from scripts.http_session import get_http_session, DEFAULT_TIMEOUT
+from scripts.image_requests import image_request_sizes, image_results
+
 def generate_text(prompt, instructions, client, model="gpt-4o",
                    output_type = 'text'):
   '''Get a text completion from the OpenAI API'''
@@ -18,21 +20,27 @@ def generate_text(prompt, instructions, client, model="gpt-4o",
 
   return response
 
-def generate_image(prompt, client, model = "dall-e-3"):
-  '''Generates an image using the OpenAI API'''
+def generate_image(prompt, client, model = "dall-e-3", n = 1, max_workers = 4):
+  '''Generates n images using the OpenAI API.
+  Returns (image_url, revised_prompt) for n=1, otherwise a list of them.
+  When n is more than the model accepts per request, the requests run concurrently.
+  Models that return base64 data instead of URLs (gpt-image-1) give a data URL.'''
+
+  def request(count):
+    response_img = client.images.generate(
+      model= model,
+      prompt=prompt,
+      size="1024x1024",
+      quality="standard",
+      n=count,
+    )
+    return image_results(response_img)
 
-  response_img = client.images.generate(
-    model= model,
-    prompt=prompt,
-    size="1024x1024",
-    quality="standard",
-    n=1,
-  )
-  time.sleep(1)
-  image_url = response_img.data[0].url
-  revised_prompt = response_img.data[0].revised_prompt
+  counts = image_request_sizes(n, model)
+  with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(counts)))) as executor:
+    images = [image for batch in executor.map(request, counts) for image in batch]
 
-  return image_url, revised_prompt
+  return images[0] if n == 1 else images
 
 def generate_image_description(image_urls, instructions, client):
   '''Generates a description of a list of image_urls using the OpenAI Vision API'''
@@ -64,7 +72,10 @@ def encode_image(image_path):
 def display_image_url(image_url, width = 500, height = 500):
   '''Create static url for image located at image_url so it remains in the notebook
   even after the link dies '''
-  response = requests.get(image_url)
+  if image_url.startswith('data:'):
+    # Already embedded (base64 results of gpt-image-1)
+    return f'<img src="{image_url}" width="{width}" height="{height}"/>'
+  response = get_http_session().get(image_url, timeout=DEFAULT_TIMEOUT)
   image_data = response.content
   # Encoding the image data as base64
   base64_image = base64.b64encode(image_data).decode('utf-8')
@@ -0,0 +1,245 @@
+import os
+import json
+import sqlite3
+import threading
+from types import SimpleNamespace
+
+
+def to_record(obj):
+    """Converts an ElevenLabs SDK model (pydantic) or plain object into JSON-serializable data."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    if hasattr(obj, "dict"):
+        return json.loads(json.dumps(obj.dict(), default=str))
+    if isinstance(obj, SimpleNamespace):
+        return {key: to_record(value) for key, value in vars(obj).items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_record(value) for value in obj]
+    if isinstance(obj, dict):
+        return {key: to_record(value) for key, value in obj.items()}
+    return obj
+
+
+def to_namespace(data):
+    """Turns stored JSON back into objects with attribute access, like the SDK models they came from."""
+    if isinstance(data, dict):
+        return SimpleNamespace(**{key: to_namespace(value) for key, value in data.items()})
+    if isinstance(data, list):
+        return [to_namespace(value) for value in data]
+    return data
+
+
+class ConversationStore:
+    """
+    A local SQLite copy of ElevenLabs conversation listings and transcripts.
+
+    Conversation list items are stored per agent with their start time and duration in indexed
+    columns, so time and duration filters run as local queries. Full conversation details
+    (transcript, analysis) are stored once a conversation is finished, so they are downloaded once.
+    Stored records are returned as `SimpleNamespace` objects with the same attributes as the SDK models.
+    Per agent, the store also records how far the backfill of older conversations has got, so an
+    interrupted first sync resumes where it stopped.
+
+    Attributes:
+    ----------
+    path : str
+        Path to the SQLite database file.
+    """
+
+    # Conversations in any other state may still change, so they are refreshed on the next sync
+    FINAL_STATUSES = ("done", "failed")
+
+    def __init__(self, path="elevenlabs_conversations.sqlite"):
+        """
+        Opens (or creates) the store.
+
+        Parameters:
+        ----------
+        path : str, optional (default='elevenlabs_conversations.sqlite')
+            Path to the SQLite database file. Parent directories are created if needed.
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        # One connection shared across threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS conversations (
+                    conversation_id TEXT PRIMARY KEY,
+                    agent_id TEXT NOT NULL,
+                    start_time_unix_secs INTEGER,
+                    call_duration_secs INTEGER,
+                    status TEXT,
+                    summary TEXT NOT NULL,
+                    detail TEXT
+                )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_conversations_agent_start "
+                "ON conversations (agent_id, start_time_unix_secs)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_conversations_agent_duration "
+                "ON conversations (agent_id, call_duration_secs)"
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS sync_state (
+                    agent_id TEXT PRIMARY KEY,
+                    backfill_cursor TEXT,
+                    backfill_complete INTEGER NOT NULL DEFAULT 0
+                )"""
+            )
+
+    def save_summaries(self, agent_id, conversations):
+        """
+        Inserts or updates conversation list items of an agent. Stored details are kept.
+
+        Parameters:
+        ----------
+        agent_id : str
+            The agent the conversations belong to.
+        conversations : list
+            Conversation list items (SDK models) as returned by the conversations endpoint.
+        """
+        rows = []
+        for conversation in conversations:
+            record = to_record(conversation)
+            rows.append((
+                record["conversation_id"],
+                agent_id,
+                record.get("start_time_unix_secs"),
+                record.get("call_duration_secs"),
+                record.get("status"),
+                json.dumps(record),
+            ))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """INSERT INTO conversations
+                       (conversation_id, agent_id, start_time_unix_secs, call_duration_secs, status, summary)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(conversation_id) DO UPDATE SET
+                       start_time_unix_secs = excluded.start_time_unix_secs,
+                       call_duration_secs = excluded.call_duration_secs,
+                       status = excluded.status,
+                       summary = excluded.summary""",
+                rows,
+            )
+
+    def final_ids(self, conversation_ids):
+        """Returns the subset of `conversation_ids` stored in a final state (done or failed)."""
+        conversation_ids = list(conversation_ids)
+        if not conversation_ids:
+            return set()
+        placeholders = ",".join("?" * len(conversation_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT conversation_id FROM conversations WHERE conversation_id IN ({placeholders}) "
+                f"AND status IN ({','.join('?' * len(self.FINAL_STATUSES))})",
+                [*conversation_ids, *self.FINAL_STATUSES],
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def save_detail(self, conversation_id, conversation):
+        """Stores the full details of a conversation whose list item is already stored."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE conversations SET detail = ? WHERE conversation_id = ?",
+                (json.dumps(to_record(conversation)), conversation_id),
+            )
+
+    def get_detail(self, conversation_id):
+        """
+        Returns the stored details of a finished conversation, or None if they are missing or may still change.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT detail FROM conversations WHERE conversation_id = ?", (conversation_id,)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        detail = json.loads(row[0])
+        if detail.get("status", "done") not in self.FINAL_STATUSES:
+            return None
+        return to_namespace(detail)
+
+    def query(self, agent_id, start_time_unix_secs=None, longer_than_secs=None, limit=None):
+        """
+        Returns stored conversation list items of an agent, newest first.
+
+        Parameters:
+        ----------
+        agent_id : str
+            The agent whose conversations to return.
+        start_time_unix_secs : int, optional
+            Only conversations that started at or after this time.
+        longer_than_secs : float, optional
+            Only conversations whose call lasted longer than this many seconds.
+        limit : int, optional
+            Maximum number of conversations to return.
+
+        Returns:
+        -------
+        list
+            Conversation list items with the attributes of the SDK models.
+        """
+        sql = "SELECT summary FROM conversations WHERE agent_id = ?"
+        params = [agent_id]
+        if start_time_unix_secs is not None:
+            sql += " AND start_time_unix_secs >= ?"
+            params.append(start_time_unix_secs)
+        if longer_than_secs is not None:
+            sql += " AND call_duration_secs > ?"
+            params.append(longer_than_secs)
+        sql += " ORDER BY start_time_unix_secs DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [to_namespace(json.loads(row[0])) for row in rows]
+
+    def get_sync_state(self, agent_id):
+        """
+        Returns the backfill progress of an agent.
+
+        Returns:
+        -------
+        tuple or None
+            (cursor of the next older page to read, whether the full history has been read),
+            or None if the agent was never synced.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT backfill_cursor, backfill_complete FROM sync_state WHERE agent_id = ?", (agent_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], bool(row[1])
+
+    def set_sync_state(self, agent_id, cursor, complete):
+        """Records the backfill progress of an agent: the next older page to read and whether the history is complete."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT INTO sync_state (agent_id, backfill_cursor, backfill_complete) VALUES (?, ?, ?)
+                   ON CONFLICT(agent_id) DO UPDATE SET
+                       backfill_cursor = excluded.backfill_cursor,
+                       backfill_complete = excluded.backfill_complete""",
+                (agent_id, None if complete else cursor, int(complete)),
+            )
+
+    def clear(self, agent_id=None):
+        """Removes the stored conversations and sync progress of one agent, or of all agents."""
+        with self._lock, self._conn:
+            if agent_id is None:
+                self._conn.execute("DELETE FROM conversations")
+                self._conn.execute("DELETE FROM sync_state")
+            else:
+                self._conn.execute("DELETE FROM conversations WHERE agent_id = ?", (agent_id,))
+                self._conn.execute("DELETE FROM sync_state WHERE agent_id = ?", (agent_id,))
+
+    def close(self):
+        """Closes the database connection."""
+        with self._lock:
+            self._conn.close()
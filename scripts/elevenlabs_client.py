@@ -1,7 +1,12 @@
-import requests
 import time
+import threading
+import requests
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from elevenlabs import ElevenLabs
+from scripts.rate_limiter import get_scheduler
+from scripts.conversation_store import ConversationStore
+from scripts.http_session import get_http_session, DEFAULT_TIMEOUT
 
 class ElevenLabsAPI:
     """
@@ -13,36 +18,100 @@ class ElevenLabsAPI:
     - Retrieve past conversations and filter them
     """
 
-    def __init__(self, api_key):
+    # Rate key of all ElevenLabs requests in the rate limit scheduler
+    RATE_KEY = "elevenlabs"
+
+    def __init__(self, api_key, scheduler=None, store=None, agent_cache_ttl=300):
         """
         Initialize the ElevenLabs API client.
 
         Args:
             api_key (str): The ElevenLabs API key for authentication.
+            scheduler (RateLimitScheduler, optional): Paces and retries requests. Defaults to the
+                process-wide scheduler shared with GenAI. Limits can be set with
+                `scheduler.set_limits(ElevenLabsAPI.RATE_KEY, rpm=...)`.
+            store (ConversationStore or str, optional): A local conversation store, or a path to a
+                SQLite file to open one at. When set, conversation listings are synced incrementally,
+                filters run as local queries and finished transcripts are downloaded once.
+                Defaults to None (every call goes to the API).
+            agent_cache_ttl (float, optional): Seconds that agent configs and the agent list are reused
+                before being fetched again (default 300). `update_agent` invalidates them. 0 disables caching.
         """
         self.api_key = api_key
         self.base_url = "https://api.elevenlabs.io/v1/convai"
         self.client = ElevenLabs(api_key = api_key)
+        self.scheduler = scheduler or get_scheduler()
+        if isinstance(store, str):
+            store = ConversationStore(store)
+        self.store = store
+        self.agent_cache_ttl = agent_cache_ttl
+        self._agent_cache_lock = threading.Lock()
+        self._agent_cache = {}  # agent_id -> (expiry time, agent config)
+        self._agents_cache = None  # (expiry time, agent list)
         self.AGENT_IDS_PROTECTED = []
 
-    def get_agents(self):
+    def _send(self, fn, *args, **kwargs):
+        """Calls the API through the rate limit scheduler, retrying 429s (honouring Retry-After) and transient errors."""
+        return self.scheduler.call(self.RATE_KEY, fn, *args, **kwargs)
+
+    def _cache_get(self, key):
+        """Returns an unexpired cached agent config (or the agent list for key None), else None."""
+        with self._agent_cache_lock:
+            entry = self._agents_cache if key is None else self._agent_cache.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def _cache_set(self, key, value):
+        """Caches an agent config (or the agent list for key None) for `agent_cache_ttl` seconds."""
+        if not self.agent_cache_ttl:
+            return
+        entry = (time.monotonic() + self.agent_cache_ttl, value)
+        with self._agent_cache_lock:
+            if key is None:
+                self._agents_cache = entry
+            else:
+                self._agent_cache[key] = entry
+
+    def clear_agent_cache(self, agent_id=None):
+        """
+        Drops cached agent data: one agent's config and the agent list, or everything if `agent_id` is None.
+        """
+        with self._agent_cache_lock:
+            self._agents_cache = None
+            if agent_id is None:
+                self._agent_cache.clear()
+            else:
+                self._agent_cache.pop(agent_id, None)
+
+    def get_agents(self, refresh=False):
         """
         Fetches a list of available ElevenLabs AI agents.
 
+        Args:
+            refresh (bool, optional): Bypass the agent cache and fetch the list again (default False).
+
         Returns:
             list: A list of agent dictionaries containing "agent_id" and "name".
         """
-        agents = self.client.conversational_ai.get_agents().agents
+        agents = None if refresh else self._cache_get(None)
+        if agents is None:
+            agents = self._send(self.client.conversational_ai.get_agents).agents
+            self._cache_set(None, agents)
         agents = [agent for agent in agents if agent.agent_id not in self.AGENT_IDS_PROTECTED ]
         #agents =  [agent for agent in agents ]
         return agents
     
-    def get_agent(self, agent_id):
+    def get_agent(self, agent_id, refresh=False):
         """
         Retrieves configuration details for a specific ElevenLabs AI agent.
 
+        Configs are cached for `agent_cache_ttl` seconds, so repeated lookups (e.g. of the agent
+        name) do not call the API.
+
         Args:
             agent_id (str): The ID of the agent.
+            refresh (bool, optional): Bypass the agent cache and fetch the config again (default False).
 
         Returns:
             dict: A dictionary containing the agent's data:
@@ -53,8 +122,13 @@ class ElevenLabsAPI:
                 - "prompt": The conversation prompt
         """
 
+        agent = None if refresh else self._cache_get(agent_id)
+        if agent is not None:
+            return agent
+
         try:
-            agent = self.client.conversational_ai.get_agent(agent_id)
+            agent = self._send(self.client.conversational_ai.get_agent, agent_id)
+            self._cache_set(agent_id, agent)
 
             return agent
 
@@ -62,6 +136,25 @@ class ElevenLabsAPI:
             print(f"❌ Error fetching agent data for {agent_id}: {e}")
             return {"error": str(e)}
 
+    def get_agents_details(self, agent_ids, max_workers=8, refresh=False):
+        """
+        Retrieves the configs of many agents concurrently. Cached configs are returned without a request.
+
+        Args:
+            agent_ids (list): The IDs of the agents.
+            max_workers (int, optional): Maximum number of requests in flight at once (default 8).
+            refresh (bool, optional): Bypass the agent cache (default False).
+
+        Returns:
+            dict: Agent config (or {"error": ...}, as from `get_agent`) by agent ID.
+        """
+        agent_ids = list(dict.fromkeys(agent_ids))
+        if not agent_ids:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(agent_ids)))) as executor:
+            agents = executor.map(lambda agent_id: self.get_agent(agent_id, refresh=refresh), agent_ids)
+            return dict(zip(agent_ids, agents))
+
 
     def update_agent(self, data):
         """
@@ -126,45 +219,145 @@ class ElevenLabsAPI:
         if conversation_config:
             payload["conversation_config"] = conversation_config
 
+        def patch():
+            response = get_http_session().patch(url, json=payload, headers=headers, timeout=DEFAULT_TIMEOUT)
+            if response.status_code == 429 or response.status_code >= 500:
+                response.raise_for_status()  # Let the scheduler retry rate limits and server errors
+            return response
+
         # Perform the PATCH request
         #print(f"Payload: {payload}")
-        response = requests.patch(url, json=payload, headers=headers)
+        try:
+            response = self._send(patch)
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error updating agent {agent_id}: {e}")
+            return False
+
+        if response.status_code == 200:
+            self.clear_agent_cache(agent_id)  # The cached config (and maybe the name in the list) is stale
         return response.status_code == 200
 
+    def update_agents(self, updates, max_workers=8):
+        """
+        Updates many agents concurrently, over the shared pooled HTTP session.
+
+        Args:
+            updates (list): One `update_agent` data dict per agent, each with its "agent_id".
+            max_workers (int, optional): Maximum number of requests in flight at once (default 8).
+                The rate limit scheduler still paces them.
+
+        Returns:
+            dict: True if the update of an agent succeeded, else False, by agent ID.
+        """
+        updates = list(updates)
+        if not updates:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(updates)))) as executor:
+            results = executor.map(self.update_agent, updates)
+            return {data.get("agent_id"): success for data, success in zip(updates, results)}
 
 
-    def get_all_conversations(self, agent_id):
+
+    def get_all_conversations(self, agent_id, start_time_unix_secs=None):
         """
-        Retrieves all conversations for a given AI agent.
+        Retrieves all conversations for a given AI agent, newest first.
 
         Args:
             agent_id (str): The ID of the agent whose conversations to fetch.
+            start_time_unix_secs (int, optional): Only return conversations that started at or after
+                this time. The API lists conversations newest first, so paging stops at the first
+                page that reaches older conversations. Defaults to None (all conversations).
 
         Returns:
             list: A list of conversation objects.
         """
+        if self.store is not None:
+            self.sync_conversations(agent_id)
+            return self.store.query(agent_id, start_time_unix_secs=start_time_unix_secs)
+
         all_conversations = []
         has_more = True
         cursor = None  # Initialize cursor for pagination
 
         while has_more:
-            # Make API call with or without cursor
-            if cursor:
-                response = self.client.conversational_ai.get_conversations(agent_id=agent_id, cursor=cursor)
-            else:
-                response = self.client.conversational_ai.get_conversations(agent_id=agent_id)
+            response = self._get_conversations_page(agent_id, cursor)
 
             # Append retrieved conversations
-            all_conversations.extend(response.conversations)
+            conversations = response.conversations
+            if start_time_unix_secs is not None:
+                conversations = [c for c in conversations if c.start_time_unix_secs >= start_time_unix_secs]
+            all_conversations.extend(conversations)
 
-            # Check if there's more data to fetch
-            has_more = response.has_more
+            # Check if there's more data to fetch (none once this page reached older conversations)
+            has_more = response.has_more and len(conversations) == len(response.conversations)
             cursor = response.next_cursor if has_more else None
 
-            time.sleep(0.1)  # Prevent API rate limiting
-
         return all_conversations
 
+    def _get_conversations_page(self, agent_id, cursor=None):
+        """Fetches one page of an agent's conversation list, newest first."""
+        # Make API call with or without cursor
+        if cursor:
+            return self._send(self.client.conversational_ai.get_conversations, agent_id=agent_id, cursor=cursor)
+        return self._send(self.client.conversational_ai.get_conversations, agent_id=agent_id)
+
+    def sync_conversations(self, agent_id):
+        """
+        Brings the local store up to date with an agent's conversation list.
+
+        Pages are fetched newest first until the first conversation that is already stored in a
+        final state, so a repeat sync costs one API page when nothing new happened. Conversations
+        stored while still in progress are refreshed when they come up again.
+
+        Until the agent's full history has been read once, the store keeps the cursor of the next
+        older page, and each sync then continues reading older pages from it. A first sync that was
+        interrupted therefore resumes where it stopped instead of skipping the older pages.
+
+        Args:
+            agent_id (str): The ID of the agent.
+
+        Returns:
+            int: The number of new or updated conversations.
+        """
+        if self.store is None:
+            raise ValueError("sync_conversations needs a ConversationStore (pass store= to ElevenLabsAPI).")
+
+        # Never synced: the newest pages are also the start of the backfill, so record progress as we go
+        first_sync = self.store.get_sync_state(agent_id) is None
+
+        synced = 0
+        cursor = None
+        while True:
+            response = self._get_conversations_page(agent_id, cursor)
+            page = response.conversations
+            known = self.store.final_ids(c.conversation_id for c in page)
+
+            fresh = []
+            for conversation in page:
+                if conversation.conversation_id in known:
+                    break
+                fresh.append(conversation)
+            self.store.save_summaries(agent_id, fresh)
+            synced += len(fresh)
+
+            if first_sync:
+                self.store.set_sync_state(agent_id, response.next_cursor, complete=not response.has_more)
+            elif not response.has_more:
+                self.store.set_sync_state(agent_id, None, complete=True)  # Read through to the oldest page
+
+            if len(fresh) < len(page) or not response.has_more:
+                break
+            cursor = response.next_cursor
+
+        # Resume the backfill of older pages where the last sync stopped
+        cursor, complete = self.store.get_sync_state(agent_id)
+        while not complete and cursor:
+            response = self._get_conversations_page(agent_id, cursor)
+            self.store.save_summaries(agent_id, response.conversations)
+            synced += len(response.conversations)
+            cursor, complete = response.next_cursor, not response.has_more
+            self.store.set_sync_state(agent_id, cursor, complete)
+        return synced
 
     def get_conversation(self, conversation_id):
         """
@@ -174,10 +367,35 @@ class ElevenLabsAPI:
             conversation_id (str): The unique ID of the conversation.
 
         Returns:
-            dict: The conversation details.
+            dict: The conversation details. With a store, finished conversations are read from it.
         """
-        response = self.client.conversational_ai.get_conversation(conversation_id)
+        if self.store is not None:
+            stored = self.store.get_detail(conversation_id)
+            if stored is not None:
+                return stored
+
+        response = self._send(self.client.conversational_ai.get_conversation, conversation_id)
+
+        if self.store is not None:
+            self.store.save_detail(conversation_id, response)
         return response
+
+    def get_conversations(self, conversation_ids, max_workers=8):
+        """
+        Fetches the details of many conversations concurrently.
+
+        Args:
+            conversation_ids (list): The IDs of the conversations.
+            max_workers (int, optional): Maximum number of requests in flight at once (default 8).
+                The rate limit scheduler still paces and retries them.
+
+        Returns:
+            list: The conversation details, in the order of `conversation_ids`.
+        """
+        if max_workers <= 1 or len(conversation_ids) <= 1:
+            return [self.get_conversation(conversation_id) for conversation_id in conversation_ids]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(conversation_ids))) as executor:
+            return list(executor.map(self.get_conversation, conversation_ids))
     def get_most_recent_conversation(self, agent_id):
         """
         Retrieves the most recent conversation for a given AI agent.
@@ -188,8 +406,12 @@ class ElevenLabsAPI:
         Returns:
             dict: The most recent conversation object.
         """
-        all_conversations = self.get_all_conversations(agent_id)
-        most_recent_conversation = all_conversations[0]
+        # Conversations are listed newest first, so only the first page is needed
+        if self.store is not None:
+            self.sync_conversations(agent_id)
+            most_recent_conversation = self.store.query(agent_id, limit=1)[0]
+        else:
+            most_recent_conversation = self._get_conversations_page(agent_id).conversations[0]
         conversation_id = most_recent_conversation.conversation_id
         conversation = self.get_conversation(conversation_id)
         return conversation
@@ -217,7 +439,7 @@ class ElevenLabsAPI:
                 conversation_transcript += f"{role}: {msg.message}\n"
         return conversation_transcript
             
-    def get_conversation_summaries_string(self, agent_id, start_time, call_duration_min_secs):      
+    def get_conversation_summaries_string(self, agent_id, start_time, call_duration_min_secs, max_workers=8):      
         """
         Retrieves all conversations after a given start time and with a minimum call duration, and formats them as a string.
         with format "TIME: {formatted_time}, SPEAKER: {speaker_name}, DURATION: {call_duration_secs} seconds, SUMMARY: {transcript_summary}"
@@ -225,20 +447,27 @@ class ElevenLabsAPI:
             agent_id (str): The ID of the agent.
             start_time (datetime): The start time to filter conversations.
             call_duration_min_secs (int): The minimum call duration in seconds. 
+            max_workers (int, optional): Number of conversation details fetched concurrently (default 8, 1 fetches them one at a time).
         Returns:
             str: The conversation summaries formatted as a string.
         """
 
         start_time_unix_sec = int(start_time.timestamp())
-        conversations = self.get_all_conversations(agent_id)
-        conversations = [conversation for conversation in conversations if conversation.start_time_unix_secs >= start_time_unix_sec]
-        conversations = [conversation for conversation in conversations if conversation.call_duration_secs > call_duration_min_secs]
+        if self.store is not None:
+            # Indexed local query after an incremental sync
+            self.sync_conversations(agent_id)
+            conversations = self.store.query(agent_id, start_time_unix_secs=start_time_unix_sec,
+                                             longer_than_secs=call_duration_min_secs)
+        else:
+            conversations = self.get_all_conversations(agent_id, start_time_unix_secs=start_time_unix_sec)
+            conversations = [conversation for conversation in conversations if conversation.call_duration_secs > call_duration_min_secs]
         print(f"\tThere are {len(conversations)} conversations after {start_time} with a minimum call duration of {call_duration_min_secs} seconds.")
 
+        details = self.get_conversations([c.conversation_id for c in conversations], max_workers=max_workers)
+
         summaries = "["
-        for c in conversations:
+        for c, conversation in zip(conversations, details):
             tstart = datetime.fromtimestamp(c.start_time_unix_secs)
-            conversation = self.get_conversation(c.conversation_id)
             #speaker = conversation.analysis.data_collection_results['SPEAKER'].value
             summaries += "\n{" + f"\nTIME: {tstart},\nDURATION: {c.call_duration_secs} seconds,\nSUMMARY:{conversation.analysis.transcript_summary}" + "},"
         summaries += "]"
@@ -0,0 +1,101 @@
+import numpy as np
+from scripts.openai_clients import get_openai_client
+
+
+def embedding_inputs(texts):
+    """
+    Prepares texts for the embeddings API: newlines become spaces, and empty texts become a single space.
+
+    The API rejects empty strings with a 400 that fails the whole batch, so they are sent as " "
+    instead of being skipped. Every input therefore still gets a real vector of the model's
+    dimension, at its own position (all empty texts, e.g. media-only tweets, share that vector).
+    """
+    return [text.replace("\n", " ") or " " for text in texts]
+
+
+def embedding_batches(texts, batch_size=256, max_tokens_per_batch=250000):
+    """
+    Splits `texts` into contiguous batches that respect both the item and token limits.
+
+    Yields:
+    ------
+    tuple
+        (start index of the batch in `texts`, list of texts in the batch)
+    """
+    batch_start = 0
+    batch = []
+    batch_tokens = 0
+    for i, text in enumerate(texts):
+        text_tokens = len(text) // 4 + 1  # rough estimate, ~4 characters per token
+        if batch and (len(batch) >= batch_size or batch_tokens + text_tokens > max_tokens_per_batch):
+            yield batch_start, batch
+            batch_start, batch, batch_tokens = i, [], 0
+        batch.append(text)
+        batch_tokens += text_tokens
+    if batch:
+        yield batch_start, batch
+
+
+def embed_texts(create, texts, model="text-embedding-3-small", batch_size=256, max_tokens_per_batch=250000):
+    """
+    Embeds many texts, packing several inputs into each request.
+
+    Parameters:
+    ----------
+    create : callable
+        Sends one request: called as `create(input=batch, model=model)`, it returns an embeddings
+        response (e.g. `client.embeddings.create`).
+    texts : list of str
+        The input texts, prepared with `embedding_inputs` (newlines become spaces, empty texts a single space).
+    model : str, optional
+        The OpenAI embedding model to use. Defaults to 'text-embedding-3-small'.
+    batch_size : int, optional
+        Maximum number of texts sent in a single request. Defaults to 256 (the API allows up to 2048).
+    max_tokens_per_batch : int, optional
+        Approximate token budget per request. Defaults to 250,000, below the API's 300,000 limit.
+
+    Returns:
+    -------
+    np.ndarray
+        A float32 matrix of shape (len(texts), embedding_dim). Row i is the embedding of texts[i].
+    """
+    texts = embedding_inputs(texts)
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    embeddings = [None] * len(texts)
+    for batch_start, batch in embedding_batches(texts, batch_size, max_tokens_per_batch):
+        response = create(input=batch, model=model)
+        # Results are placed by the `index` field of each item, so input order is preserved
+        for item in response.data:
+            embeddings[batch_start + item.index] = item.embedding
+
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+class Embedder:
+    """
+    Batched OpenAI embeddings, with the same `get_embeddings` as GenAI.
+
+    Only needs `openai` and NumPy, so apps that just embed texts (e.g. the Twitter dashboard's
+    tweet index) do not import GenAI's video and document dependencies. Requests go through the
+    shared client from `scripts.openai_clients` and are retried by the SDK itself.
+
+    Example:
+    -------
+    >>> index.add_texts(Embedder(openai_api_key), df['text'].tolist())
+    """
+
+    def __init__(self, openai_api_key=None):
+        """
+        Parameters:
+        ----------
+        openai_api_key : str, optional
+            The OpenAI API key. Defaults to the OPENAI_API_KEY environment variable.
+        """
+        self.client = get_openai_client(openai_api_key)
+
+    def get_embeddings(self, texts, model="text-embedding-3-small", batch_size=256, max_tokens_per_batch=250000):
+        """Generates embedding vectors for many texts. See `embed_texts`."""
+        return embed_texts(self.client.embeddings.create, texts, model=model, batch_size=batch_size,
+                           max_tokens_per_batch=max_tokens_per_batch)
@@ -0,0 +1,128 @@
+import numpy as np
+
+
+class EngagementPredictor:
+    """
+    A lightweight local model that predicts a tweet's engagement from its embedding.
+
+    Trained in-process on an account's historical tweets (embeddings and `engagement` column),
+    so scoring new texts needs no API call beyond embedding them. Two methods are available:
+
+    - "ridge": closed-form ridge regression. Fitting solves one linear system of size
+      min(n_tweets, embedding_dim); predicting is a single matrix-vector product.
+    - "knn": similarity-weighted average over the `k` most similar historical tweets.
+
+    Engagement is heavy-tailed, so both methods work on log(engagement + epsilon) and predictions
+    are transformed back to the engagement scale.
+
+    Example:
+    -------
+    >>> model = EngagementPredictor().fit(index.get_vectors(keys), df['engagement'])
+    >>> predicted = model.predict(genai.get_embeddings(candidates))
+    """
+
+    def __init__(self, method="ridge", alpha=1.0, k=20, epsilon=1e-4):
+        """
+        Initializes the predictor.
+
+        Parameters:
+        ----------
+        method : str, optional
+            "ridge" (default) or "knn".
+        alpha : float, optional
+            Ridge regularization strength (default 1.0). Larger values give smoother predictions.
+        k : int, optional
+            Number of neighbours used by "knn" (default 20).
+        epsilon : float, optional
+            Offset added to engagement before taking the log, so zero engagement is allowed (default 1e-4).
+        """
+        if method not in ("ridge", "knn"):
+            raise ValueError(f"Unknown method '{method}'. Use 'ridge' or 'knn'.")
+        self.method = method
+        self.alpha = alpha
+        self.k = k
+        self.epsilon = epsilon
+        self.n_samples = 0
+
+    def fit(self, embeddings, engagement):
+        """
+        Trains the model.
+
+        Parameters:
+        ----------
+        embeddings : np.ndarray
+            Matrix of shape (n_tweets, embedding_dim).
+        engagement : array-like
+            Engagement of each tweet (e.g. favorite_count / view_count).
+
+        Returns:
+        -------
+        EngagementPredictor
+            The fitted model (self), so calls can be chained.
+        """
+        X = _normalize(np.asarray(embeddings, dtype=np.float32))
+        y = np.log(np.clip(np.asarray(engagement, dtype=np.float64), 0, None) + self.epsilon)
+        if len(X) != len(y):
+            raise ValueError("embeddings and engagement must have the same length.")
+        if len(X) == 0:
+            raise ValueError("Cannot fit on an empty dataset.")
+        self.n_samples = len(X)
+        self.y_mean_ = y.mean()
+
+        if self.method == "knn":
+            self.X_ = X
+            self.y_ = y
+            return self
+
+        # Center, then solve whichever normal equations are smaller:
+        # primal (d x d) when there are more tweets than dimensions, dual (n x n) otherwise
+        self.x_mean_ = X.mean(axis=0)
+        Xc = (X - self.x_mean_).astype(np.float64)
+        yc = y - self.y_mean_
+        n, d = Xc.shape
+        if n >= d:
+            self.coef_ = np.linalg.solve(Xc.T @ Xc + self.alpha * np.eye(d), Xc.T @ yc)
+        else:
+            self.coef_ = Xc.T @ np.linalg.solve(Xc @ Xc.T + self.alpha * np.eye(n), yc)
+        self.coef_ = self.coef_.astype(np.float32)
+        return self
+
+    def predict(self, embeddings):
+        """
+        Predicts the engagement of new texts from their embeddings, in one vectorized pass.
+
+        Parameters:
+        ----------
+        embeddings : np.ndarray
+            Matrix of shape (n_texts, embedding_dim), or a single vector.
+
+        Returns:
+        -------
+        np.ndarray
+            Predicted engagement of each text (same scale as the training `engagement`).
+        """
+        if self.n_samples == 0:
+            raise ValueError("The model is not fitted yet. Call fit() first.")
+        X = _normalize(np.atleast_2d(np.asarray(embeddings, dtype=np.float32)))
+
+        if self.method == "ridge":
+            log_engagement = (X - self.x_mean_) @ self.coef_ + self.y_mean_
+        else:
+            similarities = X @ self.X_.T
+            k = min(self.k, self.n_samples)
+            neighbours = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+            weights = np.clip(np.take_along_axis(similarities, neighbours, axis=1), 0, None)
+            weights_sum = weights.sum(axis=1)
+            log_engagement = np.where(
+                weights_sum > 0,
+                (weights * self.y_[neighbours]).sum(axis=1) / np.where(weights_sum > 0, weights_sum, 1),
+                self.y_mean_,
+            )
+
+        return np.clip(np.exp(log_engagement) - self.epsilon, 0, None)
+
+
+def _normalize(X):
+    """L2-normalizes the rows of X, so ridge and kNN see the same geometry as cosine search."""
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    return X / np.where(norms == 0, 1, norms)
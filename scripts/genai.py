@@ -3,17 +3,137 @@ import openai
 import json
 import pandas as pd
 import base64
-import requests
-import time
 import cv2
 import PyPDF2
 from docx import Document
 import re
 import openai
+from concurrent.futures import ThreadPoolExecutor
 from IPython.display import display, Image, HTML, Audio
+from scripts.response_cache import ResponseCache
+from scripts.image_prep import prepare_images
+from scripts.openai_clients import get_openai_client
+from scripts.rate_limiter import get_scheduler
+from scripts.embeddings import embed_texts
+from scripts.http_session import get_http_session, DEFAULT_TIMEOUT
+from scripts.image_requests import image_request_sizes, image_results
 
 
 
+def sample_video_frames(fname_video, max_samples=15, method="auto"):
+    """
+    Samples up to `max_samples` evenly spaced frames from a video without decoding the whole file.
+
+    Parameters:
+    ----------
+    fname_video : str
+        Path to the video file.
+    max_samples : int, optional
+        Maximum number of frames to return (default is 15).
+    method : str, optional
+        Sampling strategy (default is 'auto'):
+        - 'seek': jump to each target frame with `CAP_PROP_POS_FRAMES` and decode only that frame.
+        - 'grab': step through the file with `grab()` and only `retrieve()` the target frames.
+        - 'read': decode every frame with `read()` (the original behaviour, kept for comparison).
+        - 'auto': 'seek' when frames are sparse, 'grab' otherwise. Falls back to 'grab' if the
+          backend cannot seek accurately, and to 'read' if the frame count is unknown.
+
+    Returns:
+    -------
+    tuple
+        A tuple containing:
+        - A list of frames as BGR NumPy arrays
+        - Total number of frames in the video
+        - Frames per second (FPS) of the video
+        - A dict of stats: "method" actually used, "grabbed" frames and "decoded" frames
+    """
+    stats = {"method": method, "grabbed": 0, "decoded": 0}
+    if not os.path.exists(fname_video):
+        return [], 0, 0, stats
+
+    video = cv2.VideoCapture(fname_video)  # open the video file
+    if not video.isOpened():
+        return [], 0, 0, stats
+
+    nframes = video.get(cv2.CAP_PROP_FRAME_COUNT)  # number of frames in video
+    fps = video.get(cv2.CAP_PROP_FPS)  # frames per second in video
+
+    frame_interval = max(1, int(nframes // max_samples))  # Calculate the interval at which to sample frames
+    targets = list(range(0, int(nframes), frame_interval))[:max_samples]
+
+    if nframes <= 0:
+        method = "read"  # Unknown length, so target frames cannot be computed
+    elif method == "auto":
+        method = "seek" if frame_interval > 1 else "grab"
+
+    try:
+        frames = None
+        if method == "seek":
+            frames = _seek_frames(video, targets, stats)
+            if frames is None:
+                # Seeking is unsupported or inaccurate for this file: reopen and skip with grab()
+                video.release()
+                video = cv2.VideoCapture(fname_video)
+                method = "grab"
+        if method == "grab":
+            frames = _grab_frames(video, targets, stats)
+        elif method == "read":
+            frames = _read_frames(video, frame_interval, max_samples, stats)
+        elif frames is None:
+            raise ValueError(f"Unknown sampling method '{method}'. Use 'auto', 'seek', 'grab' or 'read'.")
+    finally:
+        video.release()
+
+    stats["method"] = method
+    return frames, nframes, fps, stats
+
+
+def _seek_frames(video, targets, stats):
+    """Decodes each target frame after seeking to it. Returns None if a seek does not land exactly."""
+    frames = []
+    for index in targets:
+        if not video.set(cv2.CAP_PROP_POS_FRAMES, index) or int(video.get(cv2.CAP_PROP_POS_FRAMES)) != index:
+            return None
+        success, frame = video.read()
+        stats["decoded"] += 1
+        if not success:
+            break
+        frames.append(frame)
+    return frames
+
+
+def _grab_frames(video, targets, stats):
+    """Advances with grab() and only retrieves the target frames, stopping after the last one."""
+    frames = []
+    wanted = set(targets)
+    last_target = targets[-1] if targets else -1
+    for index in range(last_target + 1):
+        if not video.grab():
+            break
+        stats["grabbed"] += 1
+        if index in wanted:
+            success, frame = video.retrieve()
+            stats["decoded"] += 1
+            if success:
+                frames.append(frame)
+    return frames
+
+
+def _read_frames(video, frame_interval, max_samples, stats):
+    """Decodes frames one by one with read(), keeping every `frame_interval`-th frame."""
+    frames = []
+    current_frame = 0
+    while len(frames) < max_samples:
+        success, frame = video.read()
+        if not success:
+            break
+        stats["decoded"] += 1
+        if current_frame % frame_interval == 0:
+            frames.append(frame)
+        current_frame += 1
+    return frames
+
+
 class GenAI:
     """
     A class for interacting with the OpenAI API to generate text, images, video descriptions,
@@ -21,10 +141,15 @@ class GenAI:
 
     Attributes:
     ----------
-    client : openai.Client
-        An instance of the OpenAI client initialized with the API key.
+    client : openai.OpenAI
+        A shared OpenAI client for the API key, taken from the process-wide pool in `scripts.openai_clients`.
+        Its own retries are disabled: requests go through `scheduler`, which paces and retries them.
+    cache : ResponseCache or None
+        Optional on-disk cache of text completions. `None` disables caching.
+    scheduler : RateLimitScheduler
+        Paces requests per model to the account's rate limits and retries rate-limited or failed requests.
     """
-    def __init__(self, openai_api_key):
+    def __init__(self, openai_api_key, cache=None, scheduler=None):
         """
         Initializes the GenAI class with the provided OpenAI API key.
 
@@ -32,9 +157,57 @@ class GenAI:
         ----------
         openai_api_key : str
             The API key for accessing OpenAI's services.
+        cache : ResponseCache or str, optional
+            A `ResponseCache` instance, or a path to a SQLite file to open one at.
+            When set, identical `generate_text` calls are served from disk. Defaults to None (no caching).
+        scheduler : RateLimitScheduler, optional
+            Rate limit scheduler for API requests. Defaults to the process-wide one from `get_scheduler()`,
+            so all instances share the same per-model budgets.
         """
-        self.client = openai.Client(api_key=openai_api_key)
+        self.client = get_openai_client(openai_api_key).with_options(max_retries=0)
         self.openai_api_key = openai_api_key
+        if isinstance(cache, str):
+            cache = ResponseCache(cache)
+        self.cache = cache
+        self.scheduler = scheduler or get_scheduler()
+
+    def _send(self, raw_method, **params):
+        """
+        Sends one OpenAI request through the rate limit scheduler, keyed by the request's model.
+
+        `raw_method` is a `with_raw_response` method of the client, so the rate limit headers of each
+        response can update the scheduler's budgets before the parsed result is returned.
+        """
+        rate_key = params.get("model", "default")
+        # Uploaded files are read by each attempt, so rewind them before a retry
+        file_positions = {name: value.tell() for name, value in params.items() if hasattr(value, "seek")}
+
+        def send():
+            for name, position in file_positions.items():
+                params[name].seek(position)
+            raw_response = raw_method(**params)
+            self.scheduler.update_from_headers(rate_key, raw_response.headers)
+            return raw_response.parse()
+
+        return self.scheduler.call(rate_key, send, tokens=self._estimate_request_tokens(params))
+
+    @staticmethod
+    def _estimate_request_tokens(params):
+        """
+        Estimates the tokens a request counts against a tokens-per-minute limit: about four characters
+        per text token, a flat 765 tokens per image (a 1024px image at high detail), plus `max_tokens`.
+        """
+        tokens = params.get("max_tokens") or 0
+        for message in params.get("messages", []):
+            content = message.get("content")
+            parts = content if isinstance(content, list) else [{"type": "text", "text": content or ""}]
+            for part in parts:
+                tokens += 765 if part.get("type") == "image_url" else len(part.get("text", "")) // 4 + 1
+        texts = params.get("input")
+        if texts is not None:
+            for text in [texts] if isinstance(texts, str) else texts:
+                tokens += len(text) // 4 + 1
+        return tokens
 
     def generate_text(self, prompt, instructions='You are a helpful AI named Jarvis', model="gpt-4o-mini", output_type='text', temperature =1):
         """
@@ -57,6 +230,9 @@ class GenAI:
         output_type : str, optional (default='text')
             The format of the output. Typically 'text', but can be customized for models that support different response formats.
 
+        temperature : float, optional (default=1)
+            Sampling temperature passed to the model.
+
         Returns:
         -------
         str
@@ -67,8 +243,27 @@ class GenAI:
         >>> response = generate_text("What's the weather like today?")
         >>> print(response)
         "The weather today is sunny with a high of 75°F."
+
+        Notes:
+        -----
+        If the instance was created with a `cache`, the response is looked up by a hash of
+        (model, instructions, prompt, temperature, output_type) before calling the API.
         """
-        completion = self.client.chat.completions.create(
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(
+                method="generate_text",
+                model=model,
+                instructions=instructions,
+                prompt=prompt,
+                temperature=temperature,
+                output_type=output_type,
+            )
+            cached_response = self.cache.get(cache_key)
+            if cached_response is not None:
+                return cached_response
+
+        completion = self._send(self.client.chat.completions.with_raw_response.create,
             model=model,
             temperature=temperature,
             response_format={"type": output_type},
@@ -80,9 +275,70 @@ class GenAI:
         response = completion.choices[0].message.content
         response = response.replace("```html", "")
         response = response.replace("```", "")
+
+        if cache_key is not None:
+            self.cache.set(cache_key, response)
         return response
 
 
+    def stream_text(self, prompt, instructions='You are a helpful AI named Jarvis', model="gpt-4o-mini", output_type='text', temperature =1):
+        """
+        Streams a text completion from the OpenAI API, yielding text as it is generated.
+
+        Takes the same parameters as `generate_text`. Use it where time-to-first-token matters,
+        e.g. with Streamlit's `st.write_stream`.
+
+        Yields:
+        ------
+        str
+            Text deltas of the response, in order. Joined together they form the full response.
+
+        Notes:
+        -----
+        - Unlike `generate_text`, code fences are not stripped, since a fence may be split across deltas.
+        - If the instance has a `cache`, a cached response is yielded in one piece, and a completed
+          stream is stored in the cache. Streamed responses are cached apart from `generate_text`
+          responses, since those have their fences stripped.
+
+        Example:
+        -------
+        >>> for delta in ai.stream_text("Tell me a story"):
+        ...     print(delta, end="")
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(
+                method="stream_text",
+                model=model,
+                instructions=instructions,
+                prompt=prompt,
+                temperature=temperature,
+                output_type=output_type,
+            )
+            cached_response = self.cache.get(cache_key)
+            if cached_response is not None:
+                yield cached_response
+                return
+
+        stream = self._send(self.client.chat.completions.with_raw_response.create,
+            model=model,
+            temperature=temperature,
+            response_format={"type": output_type},
+            messages=[
+                {"role": "system", "content": instructions},
+                {"role": "user", "content": prompt}
+            ],
+            stream=True,
+        )
+        deltas = []
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                deltas.append(chunk.choices[0].delta.content)
+                yield deltas[-1]
+
+        if cache_key is not None:
+            self.cache.set(cache_key, "".join(deltas))
+
     def generate_chat_response(self, chat_history, user_message, instructions, model="gpt-4o-mini", output_type='text'):
         """
         Generates a chatbot-like response based on the conversation history.
@@ -109,7 +365,7 @@ class GenAI:
         chat_history.append({"role": "user", "content": user_message})
 
         # Call the OpenAI API to get a response
-        completion = self.client.chat.completions.create(
+        completion = self._send(self.client.chat.completions.with_raw_response.create,
             model=model,
             response_format={"type": output_type},
             messages=[
@@ -127,7 +383,38 @@ class GenAI:
         return bot_response
 
 
-    def generate_image(self, prompt, model="dall-e-3", size="1024x1024", quality="standard", n=1):
+    def stream_chat_response(self, chat_history, user_message, instructions, model="gpt-4o-mini", output_type='text'):
+        """
+        Streams a chatbot-like response based on the conversation history, yielding text as it is generated.
+
+        Takes the same parameters as `generate_chat_response`. The user message is appended to
+        `chat_history` immediately, and the full assistant response once the stream finishes.
+
+        Yields:
+        ------
+        str
+            Text deltas of the chatbot's response, in order.
+        """
+        chat_history.append({"role": "user", "content": user_message})
+
+        stream = self._send(self.client.chat.completions.with_raw_response.create,
+            model=model,
+            response_format={"type": output_type},
+            messages=[
+                {"role": "system", "content": instructions},
+                *chat_history
+            ],
+            stream=True,
+        )
+        deltas = []
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                deltas.append(chunk.choices[0].delta.content)
+                yield deltas[-1]
+
+        chat_history.append({"role": "assistant", "content": "".join(deltas)})
+
+    def generate_image(self, prompt, model="dall-e-3", size="1024x1024", quality="standard", n=1, max_workers=4):
         """
         Generates an image from a text prompt using the OpenAI DALL-E API.
 
@@ -144,31 +431,39 @@ class GenAI:
         quality : str, optional
             The quality of the generated image, such as 'standard' or 'high'. Defaults to 'standard'.
         n : int, optional
-            The number of images to generate. Defaults to 1.
+            The number of images to generate. Defaults to 1. When `n` is more than the model accepts
+            per request (1 for 'dall-e-3', 10 for 'dall-e-2'), the requests are sent concurrently.
+        max_workers : int, optional
+            Maximum number of image requests in flight at once (default 4). The rate limit
+            scheduler still paces them to the model's limits.
 
         Returns:
         -------
-        tuple
-            A tuple containing:
-            - image_url (str): The URL of the generated image.
+        tuple or list of tuple
+            For n=1, a tuple containing:
+            - image_url (str): The URL of the generated image, or a base64 data URL for models
+              that return image data (gpt-image-1).
             - revised_prompt (str): The prompt as modified by the model, if applicable.
-
-        Notes:
-        -----
-        This function introduces a short delay (`time.sleep(1)`) to ensure proper API response handling.
+            For n>1, a list with one such tuple per generated image.
         """
-        response_img = self.client.images.generate(
-            model=model,
-            prompt=prompt,
-            size=size,
-            quality=quality,
-            n=n,
-        )
-        time.sleep(1)
-        image_url = response_img.data[0].url
-        revised_prompt = response_img.data[0].revised_prompt
+        def request(count):
+            response_img = self._send(self.client.images.with_raw_response.generate,
+                model=model,
+                prompt=prompt,
+                size=size,
+                quality=quality,
+                n=count,
+            )
+            return image_results(response_img)
 
-        return image_url, revised_prompt
+        request_sizes = image_request_sizes(n, model)
+        if len(request_sizes) == 1:
+            images = request(request_sizes[0])
+        else:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(request_sizes)))) as executor:
+                images = [image for batch in executor.map(request, request_sizes) for image in batch]
+
+        return images[0] if n == 1 else images
 
     def display_image_url(self,image_url, width=256, height=256):
         """
@@ -178,7 +473,7 @@ class GenAI:
         Parameters:
         ----------
         image_url : str
-            The URL of the image to be displayed.
+            The URL of the image to be displayed. A base64 data URL is embedded as-is.
         width : int, optional
             The width (in pixels) to display the image. Defaults to 500.
         height : int, optional
@@ -196,11 +491,15 @@ class GenAI:
         ensuring it remains static even if the original URL is no longer accessible.
         - This approach is useful for displaying images in environments like Jupyter Notebooks,
         where image persistence is desired.
-        """# Validate that image_url is a proper string and has a valid URL scheme
+        """# Data URLs (base64 results of gpt-image-1) are already static
+        if isinstance(image_url, str) and image_url.startswith('data:image/'):
+            return f'<img src="{image_url}" width="{width}" height="{height}"/>'
+
+        # Validate that image_url is a proper string and has a valid URL scheme
         if not isinstance(image_url, str) or not image_url.startswith(('http://', 'https://')):
             raise ValueError(f"Invalid image URL provided: {image_url}")
 
-        response = requests.get(image_url)
+        response = get_http_session().get(image_url, timeout=DEFAULT_TIMEOUT)
         image_data = response.content
         # Encoding the image data as base64
         base64_image = base64.b64encode(image_data).decode('utf-8')
@@ -226,7 +525,8 @@ class GenAI:
         with open(image_path, "rb") as image_file:
             return base64.b64encode(image_file.read()).decode('utf-8')
 
-    def generate_image_description(self, image_paths, instructions, model = 'gpt-4o-mini'):
+    def generate_image_description(self, image_paths, instructions, model = 'gpt-4o-mini',
+                                   max_edge=None, jpeg_quality=None, max_total_bytes=None):
         """
         Generates a description for one or more images using OpenAI's vision capabilities.
 
@@ -238,16 +538,35 @@ class GenAI:
             Instructions for the description.
         model : str, optional
             The OpenAI model to use (default is 'gpt-4o-mini').
+        max_edge : int, optional
+            If set, images are downscaled so their longer side is at most this many pixels.
+        jpeg_quality : int, optional
+            If set, images are re-encoded as JPEG at this quality.
+        max_total_bytes : int, optional
+            If set, quality and size are reduced (see `prepare_images`) until the base64 payload fits.
 
         Returns:
         -------
         str
             A textual description of the image(s).
+
+        Notes:
+        -----
+        With all preparation options left as None, the image files are sent unchanged.
         """
         if isinstance(image_paths, str):
             image_paths = [image_paths]
 
-        image_urls = [f"data:image/jpeg;base64,{self.encode_image(image_path)}" for image_path in image_paths]
+        if max_edge is None and jpeg_quality is None and max_total_bytes is None:
+            image_urls = [f"data:image/jpeg;base64,{self.encode_image(image_path)}" for image_path in image_paths]
+        else:
+            base64_images, _ = prepare_images(
+                image_paths,
+                max_edge=max_edge,
+                jpeg_quality=jpeg_quality or 95,
+                max_total_bytes=max_total_bytes,
+            )
+            image_urls = [f"data:image/jpeg;base64,{base64_image}" for base64_image in base64_images]
 
         PROMPT_MESSAGES = [
             {
@@ -263,20 +582,31 @@ class GenAI:
             "max_tokens": 1000,
         }
 
-        completion = self.client.chat.completions.create(**params)
+        completion = self._send(self.client.chat.completions.with_raw_response.create, **params)
         response = completion.choices[0].message.content
         response = response.replace("```html", "")
         response = response.replace("```", "")
         return response
 
-    def extract_frames(self, fname_video, max_samples = 15):
+    def extract_frames(self, fname_video, max_samples = 15, method = "auto",
+                       max_edge=None, jpeg_quality=95, max_total_bytes=None):
         """
         Extracts frames from a video file at regular intervals.
 
         Parameters:
         ----------
-        video_path : str
+        fname_video : str
             Path to the video file.
+        max_samples : int, optional
+            Maximum number of frames to sample (default is 15).
+        method : str, optional
+            Frame sampling strategy passed to `sample_video_frames` (default is 'auto').
+        max_edge : int, optional
+            If set, frames are downscaled so their longer side is at most this many pixels.
+        jpeg_quality : int, optional
+            JPEG quality of the encoded frames (default is 95).
+        max_total_bytes : int, optional
+            If set, quality and size are reduced (see `prepare_images`) until the base64 frames fit.
 
         Returns:
         -------
@@ -286,40 +616,19 @@ class GenAI:
             - Total number of frames in the video
             - Frames per second (FPS) of the video
         """
-        if not os.path.exists(fname_video):
-            
-            return [], 0, 0
-
-        video = cv2.VideoCapture(fname_video)  # open the video file
-        if not video.isOpened():
-            #logger.error(f"Failed to open video file: {fname_video}")
-            return [], 0, 0
+        frames, nframes, fps, _ = sample_video_frames(fname_video, max_samples, method=method)
 
-        nframes = video.get(cv2.CAP_PROP_FRAME_COUNT)  # number of frames in video
-        fps = video.get(cv2.CAP_PROP_FPS)  # frames per second in video
-
-        #logger.debug(f"{nframes} frames in video")
-        #logger.debug(f"{fps} frames per second")
-
-        base64Frames = []
-        
-        frame_interval = max(1, int(nframes // max_samples))  # Calculate the interval at which to sample frames
-
-        current_frame = 0
-        while video.isOpened():
-            success, frame = video.read()
-            if not success:
-                break
-            if current_frame % frame_interval == 0 and len(base64Frames) < max_samples:
-                _, buffer = cv2.imencode(".jpg", frame)
-                base64Frames.append(base64.b64encode(buffer).decode("utf-8"))
-            current_frame += 1
-
-        video.release()
+        base64Frames, _ = prepare_images(
+            frames,
+            max_edge=max_edge,
+            jpeg_quality=jpeg_quality,
+            max_total_bytes=max_total_bytes,
+        )
 
         return base64Frames, nframes, fps
 
-    def generate_video_description(self, fname_video, instructions, max_samples=15, model='gpt-4o-mini'):
+    def generate_video_description(self, fname_video, instructions, max_samples=15, model='gpt-4o-mini',
+                                   max_edge=None, jpeg_quality=95, max_total_bytes=None):
         """
         Generates a textual description of a video by analyzing sampled frames.
 
@@ -333,6 +642,8 @@ class GenAI:
             Maximum number of frames to sample from the video (default is 15).
         model : str, optional
             OpenAI model used for generating the description (default is 'gpt-4o-mini').
+        max_edge, jpeg_quality, max_total_bytes : optional
+            Frame preparation options passed to `extract_frames`.
 
         Returns
         -------
@@ -340,14 +651,43 @@ class GenAI:
             A descriptive summary of the video content.
         """
         # Extract sampled frames and video metadata
-        base64Frames_samples, nframes, fps = self.extract_frames(fname_video, max_samples)
+        base64Frames_samples, nframes, fps = self.extract_frames(
+            fname_video,
+            max_samples,
+            max_edge=max_edge,
+            jpeg_quality=jpeg_quality,
+            max_total_bytes=max_total_bytes,
+        )
 
         # Estimate the maximum number of words based on speech rate
         words_per_second = 200 / 60  # Typical speech rate
         max_words = round(nframes / fps * words_per_second)
 
+        return self.generate_frames_description(base64Frames_samples, instructions, model=model)
+
+    def generate_frames_description(self, base64_frames, instructions, model='gpt-4o-mini'):
+        """
+        Generates a textual description of a sequence of already-extracted video frames.
+
+        This is the API half of `generate_video_description`, split out so frames can be
+        extracted ahead of time (e.g. in a worker pool) and described later.
+
+        Parameters
+        ----------
+        base64_frames : list of str
+            Base64-encoded JPEG frames, as returned by `extract_frames`.
+        instructions : str
+            Guidelines for generating the description.
+        model : str, optional
+            OpenAI model used for generating the description (default is 'gpt-4o-mini').
+
+        Returns
+        -------
+        str
+            A descriptive summary of the frames.
+        """
         # Convert frames to base64 image URLs
-        image_urls = [f"data:image/jpeg;base64,{base64_image}" for base64_image in base64Frames_samples]
+        image_urls = [f"data:image/jpeg;base64,{base64_image}" for base64_image in base64_frames]
 
         # Prepare API prompt messages
         prompt_messages = [
@@ -366,7 +706,7 @@ class GenAI:
         }
 
         # Generate completion using OpenAI's API
-        completion = self.client.chat.completions.create(**params)
+        completion = self._send(self.client.chat.completions.with_raw_response.create, **params)
         response = completion.choices[0].message.content
 
         # Clean up response formatting
@@ -402,7 +742,7 @@ class GenAI:
         """
 
         # Generate speech using OpenAI's API
-        response = self.client.audio.speech.create(
+        response = self._send(self.client.audio.speech.with_raw_response.create,
             model=model,
             voice=voice,
             input=text,
@@ -425,7 +765,7 @@ class GenAI:
             audio_file= open(audio_filename, "rb")
 
             #print("\ttranscribe audio")
-            transcription = self.client.audio.transcriptions.create(
+            transcription = self._send(self.client.audio.transcriptions.with_raw_response.create,
               model="whisper-1", 
               file=audio_file
             )
@@ -487,13 +827,43 @@ class GenAI:
         - Embeddings are useful for tasks such as semantic search, clustering, and classification.
         - The function replaces newline characters in the input text with spaces before processing.
         """
-        text = text.replace("\n", " ")
-        response = self.client.embeddings.create(
+        text = text.replace("\n", " ") or " "  # the API rejects empty strings
+        response = self._send(self.client.embeddings.with_raw_response.create,
             input=text,
             model=model
         )
         return response.data[0].embedding
 
+    def get_embeddings(self, texts, model='text-embedding-3-small', batch_size=256, max_tokens_per_batch=250000):
+        """
+        Generates embedding vectors for many texts, packing several inputs into each API request.
+
+        Parameters:
+        ----------
+        texts : list of str
+            The input texts. Newline characters are replaced with spaces, as in `get_embedding`.
+            Empty texts are sent as a single space, since the API rejects empty strings.
+        model : str, optional
+            The OpenAI embedding model to use. Defaults to 'text-embedding-3-small'.
+        batch_size : int, optional
+            Maximum number of texts sent in a single request. Defaults to 256 (the API allows up to 2048).
+        max_tokens_per_batch : int, optional
+            Approximate token budget per request. Defaults to 250,000, below the API's 300,000 limit.
+
+        Returns:
+        -------
+        np.ndarray
+            A float32 matrix of shape (len(texts), embedding_dim). Row i is the embedding of texts[i].
+
+        Notes:
+        -----
+        - Token counts are estimated at roughly four characters per token, so no tokenizer is required.
+        - Results are placed by the `index` field of each response item, so input order is preserved.
+        """
+        def create(**params):
+            return self._send(self.client.embeddings.with_raw_response.create, **params)
+
+        return embed_texts(create, texts, model=model, batch_size=batch_size, max_tokens_per_batch=max_tokens_per_batch)
 
     def remove_urls(self, text):
         url_pattern = re.compile(r'https?://\S+|www\.\S+')
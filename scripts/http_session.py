@@ -0,0 +1,50 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds for plain HTTP calls; requests has no timeout by default
+DEFAULT_TIMEOUT = (5, 30)
+
+# Connections kept alive per host, enough for the thread pools used with this session
+POOL_MAXSIZE = 32
+
+_lock = threading.Lock()
+_session = None
+
+
+def get_http_session():
+    """
+    Returns the process-wide `requests.Session` for plain HTTP calls (image downloads, ElevenLabs REST).
+
+    The session keeps up to `POOL_MAXSIZE` connections per host alive, so repeated calls skip TCP
+    and TLS setup, and it can be shared by worker threads. Its retry adapter retries failed
+    connections, and retries idempotent requests (GET, PUT, DELETE, ...) on 429 and 5xx responses
+    with exponential backoff, honouring Retry-After. Non-idempotent requests (POST, PATCH) are
+    only retried when the connection failed before the request was sent.
+
+    Pass `timeout=DEFAULT_TIMEOUT` (or another value) on every call: sessions have no default timeout.
+
+    Returns:
+    -------
+    requests.Session
+        A session shared by every caller in this process.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            retry = Retry(
+                total=3,
+                connect=3,
+                read=2,
+                status=3,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                respect_retry_after_header=True,
+            )
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
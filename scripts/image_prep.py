@@ -0,0 +1,157 @@
+import base64
+import numpy as np
+import cv2
+
+
+def load_image(image):
+    """
+    Loads an image into a BGR NumPy array.
+
+    Parameters:
+    ----------
+    image : str, bytes or np.ndarray
+        A file path, encoded image bytes (JPEG/PNG/...), or an already decoded BGR array.
+
+    Returns:
+    -------
+    tuple
+        A tuple containing:
+        - The decoded BGR image
+        - The size in bytes of the original encoded image. Arrays have no encoding, so this is the
+          size of their full-size JPEG at quality 95, which is how they were sent before `prepare_images`
+    """
+    if isinstance(image, np.ndarray):
+        return image, len(encode_jpeg(image))
+    if isinstance(image, str):
+        with open(image, "rb") as f:
+            image = f.read()
+    decoded = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if decoded is None:
+        raise ValueError("Could not decode image data.")
+    return decoded, len(image)
+
+
+def resize_long_edge(image, max_edge):
+    """
+    Downscales an image so its longer side is at most `max_edge` pixels. Smaller images are returned unchanged.
+    """
+    if not max_edge:
+        return image
+    height, width = image.shape[:2]
+    scale = max_edge / max(height, width)
+    if scale >= 1:
+        return image
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def encode_jpeg(image, jpeg_quality=95):
+    """Encodes a BGR image as JPEG bytes at the given quality (0-100)."""
+    success, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)])
+    if not success:
+        raise ValueError("Could not encode image as JPEG.")
+    return buffer.tobytes()
+
+
+def base64_length(num_bytes):
+    """Returns the length of the base64 encoding of `num_bytes` bytes."""
+    return 4 * ((num_bytes + 2) // 3)
+
+
+def prepare_images(images, max_edge=None, jpeg_quality=95, max_total_bytes=None,
+                   min_quality=40, min_edge=256, skip_unreadable=False):
+    """
+    Prepares images for a vision request: downscales, re-encodes as JPEG and enforces a payload budget.
+
+    If the encoded images exceed `max_total_bytes`, the JPEG quality is lowered in steps of 10
+    down to `min_quality`, then the long edge is shrunk by 25% at a time down to `min_edge`.
+    If the budget still cannot be met, frames are dropped evenly (keeping the first and last),
+    so a chronological sequence still covers the whole span.
+
+    Parameters:
+    ----------
+    images : list
+        File paths, encoded image bytes, or BGR NumPy arrays.
+    max_edge : int, optional
+        Target size in pixels of the longer side. Defaults to None (no resizing).
+    jpeg_quality : int, optional
+        JPEG quality to encode at (default is 95, OpenCV's default).
+    max_total_bytes : int, optional
+        Budget for the total size of the base64 payload. Defaults to None (no budget).
+    min_quality : int, optional
+        Lowest JPEG quality used when fitting the budget (default is 40).
+    min_edge : int, optional
+        Smallest long edge used when fitting the budget (default is 256).
+    skip_unreadable : bool, optional
+        If True, images that cannot be read or decoded are skipped with a warning instead of
+        raising (default is False). They are counted in the "num_unreadable" stat.
+
+    Returns:
+    -------
+    tuple
+        A tuple containing:
+        - A list of base64-encoded JPEG strings, in input order
+        - A dict of stats: "num_images", "num_dropped", "num_unreadable", "original_bytes",
+          "final_bytes", "bytes_saved", "max_edge" and "jpeg_quality" actually used.
+          Sizes are base64 lengths: "original_bytes" is what the inputs would take encoded as-is
+          (for arrays, as a full-size JPEG at quality 95), "final_bytes" what the returned strings take.
+    """
+    decoded = []
+    original_bytes = 0
+    num_unreadable = 0
+    for image in images:
+        try:
+            array, nbytes = load_image(image)
+        except (OSError, ValueError) as e:
+            if not skip_unreadable:
+                raise
+            num_unreadable += 1
+            name = f" {image}" if isinstance(image, str) else ""
+            print(f"⚠️ Skipping unreadable image{name}: {e}")
+            continue
+        decoded.append(array)
+        original_bytes += base64_length(nbytes)
+
+    def encode_all(edge, quality):
+        return [base64.b64encode(encode_jpeg(resize_long_edge(img, edge), quality)).decode("utf-8")
+                for img in decoded]
+
+    quality = jpeg_quality
+    edge = max_edge
+    encoded = encode_all(edge, quality)
+    total = sum(len(e) for e in encoded)
+
+    if max_total_bytes is not None:
+        # 1) lower the JPEG quality
+        while total > max_total_bytes and quality > min_quality:
+            quality = max(min_quality, quality - 10)
+            encoded = encode_all(edge, quality)
+            total = sum(len(e) for e in encoded)
+
+        # 2) shrink the long edge
+        if decoded:
+            current_edge = edge or max(max(img.shape[:2]) for img in decoded)
+            while total > max_total_bytes and current_edge > min_edge:
+                current_edge = max(min_edge, int(current_edge * 0.75))
+                edge = current_edge
+                encoded = encode_all(edge, quality)
+                total = sum(len(e) for e in encoded)
+
+        # 3) drop frames evenly, keeping the first and last
+        while total > max_total_bytes and len(encoded) > 1:
+            keep = len(encoded) - 1
+            indices = np.unique(np.linspace(0, len(encoded) - 1, keep).round().astype(int))
+            encoded = [encoded[i] for i in indices]
+            total = sum(len(e) for e in encoded)
+
+    stats = {
+        "num_images": len(encoded),
+        "num_dropped": len(decoded) - len(encoded),
+        "num_unreadable": num_unreadable,
+        "original_bytes": original_bytes,
+        "final_bytes": total,
+        "bytes_saved": original_bytes - total,
+        "max_edge": edge,
+        "jpeg_quality": quality,
+    }
+    return encoded, stats
@@ -0,0 +1,21 @@
+"""Helpers for images API requests, shared by GenAI, AsyncGenAI and scripts.chatgpt. No dependencies."""
+
+# Largest `n` each image model accepts in one request; unknown models get one image per request
+IMAGES_PER_REQUEST = {"dall-e-2": 10, "dall-e-3": 1, "gpt-image-1": 10}
+
+
+def image_request_sizes(n, model):
+    """Splits a request for `n` images into per-request counts the model accepts, e.g. 25 with dall-e-2 -> [10, 10, 5]."""
+    per_request = IMAGES_PER_REQUEST.get(model, 1)
+    return [min(per_request, n - start) for start in range(0, n, per_request)]
+
+
+def image_results(response_img):
+    """
+    Returns (image_url, revised_prompt) for every image of an images API response.
+    Models that return base64 data instead of URLs (gpt-image-1) get a data URL.
+    """
+    return [
+        (item.url or f"data:image/png;base64,{item.b64_json}", getattr(item, "revised_prompt", None))
+        for item in response_img.data
+    ]
@@ -6,9 +6,12 @@ import time
 import ast
 import tempfile
 import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from tqdm.auto import tqdm  # Ensures compatibility in Jupyter and Colab
 from scripts.genai import GenAI  # Import base class
+from scripts.rate_limiter import backoff_delay, is_retryable
 
 
 
@@ -18,8 +21,10 @@ class MovieAI(GenAI):
     such as analyzing scenes, generating subtitles, and summarizing movies.
     """
 
+    # Video stream parameters that must match across clips joined with stream copy (probed with FFprobe)
+    STREAM_PARAMETERS = ("codec_name", "pix_fmt", "profile", "level", "width", "height", "r_frame_rate", "time_base")
 
-    def __init__(self, openai_api_key, ffmpeg_path="ffmpeg.exe"):
+    def __init__(self, openai_api_key, ffmpeg_path="ffmpeg.exe", cache=None, ffprobe_path=None, scheduler=None):
         """
         Initializes MovieAI as an extension of GenAI.
 
@@ -29,9 +34,16 @@ class MovieAI(GenAI):
             The API key for accessing OpenAI's services.
         ffmpeg_path : str, optional (default="ffmpeg.exe")
             The path to the FFmpeg executable, used for video processing.
+        cache : ResponseCache or str, optional
+            Response cache forwarded to GenAI, so reruns of `generate_summary_script` are served from disk.
+        ffprobe_path : str, optional
+            The path to the FFprobe executable, used to probe clip durations. Defaults to the FFprobe
+            next to `ffmpeg_path`. If it cannot be found, every clip is re-encoded.
+        scheduler : RateLimitScheduler, optional
+            Rate limit scheduler forwarded to GenAI. Defaults to the process-wide one.
         """
 
-        super().__init__(openai_api_key)  # Initialize parent class (GenAI)
+        super().__init__(openai_api_key, cache=cache, scheduler=scheduler)  # Initialize parent class (GenAI)
         self.ffmpeg_path = ffmpeg_path
 
         # Check if FFmpeg is accessible
@@ -39,6 +51,14 @@ class MovieAI(GenAI):
             raise FileNotFoundError(
                 f"FFmpeg not found at '{self.ffmpeg_path}'. Please ensure FFmpeg is installed and available in PATH."
             )
+
+        # FFprobe is optional: without it the stream-copy fast path is disabled
+        if ffprobe_path is None:
+            ffprobe_path = os.path.join(
+                os.path.dirname(self.ffmpeg_path),
+                os.path.basename(self.ffmpeg_path).replace("ffmpeg", "ffprobe"),
+            )
+        self.ffprobe_path = ffprobe_path if shutil.which(ffprobe_path) else None
     
 
     def split_video(self, file_path: str, output_directory: str, segment_time: int = 60) -> None:
@@ -105,7 +125,8 @@ class MovieAI(GenAI):
 
 
 
-    def generate_clip_descriptions(self, clip_paths, instructions_base="", model = 'gpt-4o-mini', verbose = False):
+    def generate_clip_descriptions(self, clip_paths, instructions_base="", model = 'gpt-4o-mini', verbose = False,
+                                   mode="sequential", max_workers=4):
         """
         Generates a detailed description of each movie clip in `clip_paths`.
 
@@ -119,43 +140,119 @@ class MovieAI(GenAI):
             LLM model to use for generating descriptions (default: 'gpt-4o-mini').
         verbose : bool, optional
             Whether to display the descriptions as they are generated (default: False).
+        mode : str, optional
+            How clips are processed (default: 'sequential'):
+            - 'sequential': extract frames and call the API one clip at a time.
+            - 'pipelined': same chained prompts, but frames for the next `max_workers` clips are
+              extracted and encoded in a worker pool while the current clip's request is in flight.
+            - 'parallel': clips are described independently and concurrently. The previous clip's
+              description is not included in the prompt.
+        max_workers : int, optional
+            Number of worker threads for 'pipelined' and 'parallel' modes (default: 4).
 
         Returns:
         -------
         pd.DataFrame
-            A DataFrame with columns ["clip_path", "description"] containing descriptions for each clip.
+            A DataFrame with columns ["clip_path", "description"] containing descriptions for each clip,
+            in the order of `clip_paths`.
             If an error occurs for a clip, it is skipped.
             If no clips are successfully processed, returns `False`.
         """
 
+        if mode == "sequential":
+            dict_list = self._describe_clips_chained(clip_paths, instructions_base, model, verbose, prefetch=0)
+        elif mode == "pipelined":
+            dict_list = self._describe_clips_chained(clip_paths, instructions_base, model, verbose, prefetch=max_workers)
+        elif mode == "parallel":
+            dict_list = self._describe_clips_parallel(clip_paths, instructions_base, model, verbose, max_workers)
+        else:
+            raise ValueError(f"Unknown mode '{mode}'. Use 'sequential', 'pipelined' or 'parallel'.")
+
+        # Return DataFrame if at least one clip was processed, otherwise return False
+        return pd.DataFrame(dict_list) if dict_list else False
+
+    def _extract_clip_frames(self, clip_path):
+        """Extracts the sampled frames of a clip, raising if none could be read."""
+        base64_frames, nframes, fps = self.extract_frames(clip_path, max_samples=10)
+        if not base64_frames:
+            raise ValueError(f"No frames could be extracted from {clip_path}")
+        return base64_frames
+
+    def _describe_clips_chained(self, clip_paths, instructions_base, model, verbose, prefetch):
+        """
+        Describes clips in order, feeding each clip's description into the next prompt.
+        If `prefetch` > 0, frames for up to `prefetch` upcoming clips are extracted in a thread pool.
+        """
         dict_list = []
         description = "This is the first clip, so no previous scene."
 
-        for clip_path in tqdm(clip_paths, desc="Processing Clips", unit="clip"):
-            try:
-                instructions = f"""{instructions_base} Generate a detailed description of this clip from a longer video.
-                                 The previous clip in the sequence had a description:{description}"""
+        executor = ThreadPoolExecutor(max_workers=prefetch) if prefetch > 0 else None
+        pending = deque()  # Frame-extraction futures, in clip order
+        next_clip = 0
 
-                print(f"Processing: {clip_path}")
+        try:
+            for clip_path in tqdm(clip_paths, desc="Processing Clips", unit="clip"):
+                # Keep the extraction pool `prefetch` clips ahead of the API calls
+                if executor is not None:
+                    while next_clip < len(clip_paths) and len(pending) <= prefetch:
+                        pending.append(executor.submit(self._extract_clip_frames, clip_paths[next_clip]))
+                        next_clip += 1
+                    frames_future = pending.popleft()
 
-                # Generate description
-                description = self.generate_video_description(
-                    clip_path, 
-                    instructions, 
-                    max_samples=10, 
-                    model=model
-                )
-                if verbose:
-                    print(f"📝 Description for {clip_path}: {description}")
+                try:
+                    instructions = f"""{instructions_base} Generate a detailed description of this clip from a longer video.
+                                     The previous clip in the sequence had a description:{description}"""
 
-                dict_list.append({"clip_path": clip_path, "description": description})
+                    print(f"Processing: {clip_path}")
 
-            except Exception as e:
-                print(f"❌ Error processing {clip_path}: {e}")
-                continue  # Skip this clip and move to the next
+                    if executor is not None:
+                        base64_frames = frames_future.result()
+                    else:
+                        base64_frames = self._extract_clip_frames(clip_path)
 
-        # Return DataFrame if at least one clip was processed, otherwise return False
-        return pd.DataFrame(dict_list) if dict_list else False
+                    # Generate description
+                    description = self.generate_frames_description(base64_frames, instructions, model=model)
+                    if verbose:
+                        print(f"📝 Description for {clip_path}: {description}")
+
+                    dict_list.append({"clip_path": clip_path, "description": description})
+
+                except Exception as e:
+                    print(f"❌ Error processing {clip_path}: {e}")
+                    continue  # Skip this clip and move to the next
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        return dict_list
+
+    def _describe_clips_parallel(self, clip_paths, instructions_base, model, verbose, max_workers):
+        """
+        Describes every clip independently with at most `max_workers` clips in flight.
+        Results are returned in the order of `clip_paths`.
+        """
+        nclips = len(clip_paths)
+
+        def describe(index, clip_path):
+            instructions = f"""{instructions_base} Generate a detailed description of this clip from a longer video.
+                             This is clip {index + 1} of {nclips} in the sequence."""
+            base64_frames = self._extract_clip_frames(clip_path)
+            return self.generate_frames_description(base64_frames, instructions, model=model)
+
+        results = [None] * nclips
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(describe, i, clip_path): i for i, clip_path in enumerate(clip_paths)}
+            for future in tqdm(futures, desc="Processing Clips", unit="clip"):
+                i = futures[future]
+                clip_path = clip_paths[i]
+                try:
+                    results[i] = {"clip_path": clip_path, "description": future.result()}
+                    if verbose:
+                        print(f"📝 Description for {clip_path}: {results[i]['description']}")
+                except Exception as e:
+                    print(f"❌ Error processing {clip_path}: {e}")
+
+        return [result for result in results if result is not None]
 
                 
 
@@ -220,7 +317,8 @@ class MovieAI(GenAI):
 
 
 
-    def generate_audio_narrations(self, df_summary_script, voice="nova", output_dir=None):
+    def generate_audio_narrations(self, df_summary_script, voice="nova", output_dir=None,
+                                  max_workers=1, max_retries=2, backoff_seconds=1.0):
         """
         Generates audio narrations for each clip in the summary script DataFrame.
         The generated audio files are saved alongside the video clips unless a different output directory is specified.
@@ -241,6 +339,14 @@ class MovieAI(GenAI):
         output_dir : str, optional
             Directory where the audio files should be saved.
             If `None`, audio is saved next to the original video clips.
+        max_workers : int, optional
+            Maximum number of speech synthesis requests in flight at once (default: 1, one row at a time).
+        max_retries : int, optional
+            Number of times a narration is retried after a transient error (rate limit, server error,
+            network failure) that outlasted the rate limit scheduler's own retries (default: 2).
+            Other errors (invalid voice or input, authentication) fail immediately.
+        backoff_seconds : float, optional
+            Upper bound of the first retry delay. It doubles on each further retry, with random jitter (default: 1.0).
 
         Returns:
         -------
@@ -254,35 +360,66 @@ class MovieAI(GenAI):
             print(f"❌ Error: DataFrame must contain columns: {required_columns}")
             return False
 
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)  # Ensure directory exists
+
+        rows = list(zip(df_summary_script["clip_path"], df_summary_script["narration"]))
         success_count = 0  # Track successful narrations
 
-        for index, row in df_summary_script.iterrows():
-            try:
-                clip_path = row["clip_path"]
-                narration = row["narration"]
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = [
+                executor.submit(self._narrate_clip, clip_path, narration, voice, output_dir, max_retries, backoff_seconds)
+                for clip_path, narration in rows
+            ]
+            # Report in script order
+            for (clip_path, _), future in zip(rows, futures):
+                try:
+                    audio_path, ok, elapsed = future.result()
+                    if ok:
+                        print(f"✅ Audio narration created: {audio_path} ({elapsed:.1f}s)")
+                        success_count += 1
+                    else:
+                        print(f"❌ Failed to generate audio for {clip_path}")
 
-                # Determine output path
-                if output_dir:
-                    os.makedirs(output_dir, exist_ok=True)  # Ensure directory exists
-                    audio_filename = os.path.basename(clip_path).replace(".mp4", ".mp3")
-                    audio_path = os.path.join(output_dir, audio_filename)
-                else:
-                    audio_path = clip_path.replace(".mp4", ".mp3")
+                except Exception as e:
+                    print(f"❌ Error processing {clip_path}: {e}")
 
-                # Generate audio narration
-                if self.generate_audio(narration, audio_path, voice=voice):
-                    print(f"✅ Audio narration created: {audio_path}")
-                    success_count += 1
-                else:
-                    print(f"❌ Failed to generate audio for {clip_path}")
+        return success_count > 0  # Return True if at least one narration was generated
 
-            except Exception as e:
-                print(f"❌ Error processing {clip_path}: {e}")
+    def _narrate_clip(self, clip_path, narration, voice, output_dir, max_retries, backoff_seconds):
+        """
+        Synthesizes the narration of one clip, retrying transient failures with jittered exponential backoff.
 
-        return success_count > 0  # Return True if at least one narration was generated
+        The scheduler already retries each request; this outer loop only covers outages that outlast it.
+        Non-transient errors cannot succeed on a retry, so they are raised at once.
+
+        Returns:
+        -------
+        tuple
+            (audio_path, success flag, seconds spent including retries)
+        """
+        # Determine output path
+        if output_dir:
+            audio_filename = os.path.basename(clip_path).replace(".mp4", ".mp3")
+            audio_path = os.path.join(output_dir, audio_filename)
+        else:
+            audio_path = clip_path.replace(".mp4", ".mp3")
+
+        start = time.time()
+        for attempt in range(max_retries + 1):
+            try:
+                # Generate audio narration
+                ok = self.generate_audio(narration, audio_path, voice=voice)
+                return audio_path, ok, time.time() - start
+            except Exception as e:
+                if attempt == max_retries or not is_retryable(e):
+                    raise  # Retrying bad input or credentials cannot succeed
+                delay = backoff_delay(attempt, backoff_seconds)
+                print(f"⚠️ Retrying {clip_path} in {delay:.1f}s after error: {e}")
+                time.sleep(delay)
 
 
-    def generate_summary_video(self, df_summary_script, file_path: str):
+    def generate_summary_video(self, df_summary_script, file_path: str, max_workers: int = 1, stream_copy: bool = True):
         """
         Combines audio narrations with processed video clips to create a final summary video.
         After successful creation, it deletes processed video clips and audio files.
@@ -294,26 +431,31 @@ class MovieAI(GenAI):
             Must contain columns: "clip_path" (video file path).
         file_path : str
             The path for the final output summary video.
+        max_workers : int, optional
+            Number of FFmpeg processes to run concurrently when muxing clips (default: 1, one clip at a time).
+            Clips are always concatenated in script order.
+        stream_copy : bool, optional
+            If True (default) and FFprobe is available, the clips keep their H.264 video stream as-is
+            (`-c:v copy`) when every narration is no longer than its video and all clips share the same
+            resolution, frame rate, timebase and H.264 profile/level.
+            This is all or nothing: if a single clip needs the freeze-frame extension (or the clips
+            differ), every clip is re-encoded, and the reason is printed. Copied and re-encoded clips
+            cannot be mixed, because the final concatenation copies streams and keeps only the first
+            clip's H.264 headers, which do not describe clips written by another encoder.
 
         Returns:
         -------
         bool
             Returns `True` if the final video is successfully created, otherwise `False`.
+            If anything fails, processed clips that were already written are deleted.
         """
 
         # Ensure final video directory exists
         final_video_dir = os.path.dirname(os.path.abspath(file_path))
         os.makedirs(final_video_dir, exist_ok=True)
 
-        # Temporary file to store video list for concatenation
-        with tempfile.NamedTemporaryFile(delete=False, mode="w", suffix=".txt") as concat_list_file:
-            concat_list_path = concat_list_file.name
-
-        # List to store processed video clips
-        processed_clips = []
-        processed_audios = []  # Track processed audio files for cleanup
-
-        # Process each video
+        # Collect the clips to process, in script order
+        jobs = []
         for index, row in df_summary_script.iterrows():
             video_path = os.path.abspath(row["clip_path"])  # Convert to absolute path
             audio_path = video_path.replace(".mp4", ".mp3")  # Corresponding audio file
@@ -329,43 +471,191 @@ class MovieAI(GenAI):
             # Define processed clip output path
             processed_clip = os.path.join(final_video_dir, f"processed_clip_{index:03d}.mp4")
             print(f"Proccessed clips will be saved in {processed_clip}")
-            # FFmpeg command to replace audio and handle duration mismatches
-            command = [
-                self.ffmpeg_path,
-                "-y",  # ✅ Forces overwrite to prevent FFmpeg from waiting for input
-                "-i", video_path,        # Input video
-                "-i", audio_path,        # Input audio
-                "-map", "0:v:0",         # Use first video stream
-                "-map", "1:a:0",         # Use first audio stream
+            jobs.append((video_path, audio_path, processed_clip))
+
+        # Lists to store processed video clips and audio files (for cleanup), in script order
+        processed_clips = []
+        processed_audios = []
+        success = False
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                # Copying is all or nothing: the concat demuxer needs identical stream parameters
+                copy_video = stream_copy and self._can_stream_copy(jobs, executor)
+                # Each worker only waits on its own FFmpeg subprocess, so threads are enough here
+                results = list(executor.map(lambda job: self._process_summary_clip(*job, copy_video=copy_video), jobs))
+
+            for (video_path, audio_path, processed_clip), ok in zip(jobs, results):
+                if ok:
+                    processed_clips.append(processed_clip)
+                    processed_audios.append(audio_path)  # Track audio for deletion
+
+            # Ensure there are clips to concatenate
+            if not processed_clips:
+                print("❌ No valid clips processed. Cannot create summary video.")
+                return False
+
+            success = self._concatenate_clips(processed_clips, file_path)
+            if not success:
+                return False
+
+            for audio in processed_audios:
+                try:
+                    os.remove(audio)
+                    print(f"🗑️ Deleted processed audio: {audio}")
+                except Exception as e:
+                    print(f"⚠️ Failed to delete {audio}: {e}")
+
+            return True
+
+        finally:
+            # ✅ Cleanup: processed clips are always intermediate files, whether or not the final video was made
+            for _, _, clip in jobs:
+                if os.path.exists(clip):
+                    try:
+                        os.remove(clip)
+                        if success:
+                            print(f"🗑️ Deleted processed clip: {clip}")
+                    except Exception as e:
+                        print(f"⚠️ Failed to delete {clip}: {e}")
+
+    def _probe_stream(self, path, stream):
+        """
+        Reads codec information and duration of one stream with FFprobe.
+
+        Parameters:
+        ----------
+        path : str
+            Path to the media file.
+        stream : str
+            FFprobe stream specifier, e.g. "v:0" or "a:0".
+
+        Returns:
+        -------
+        dict or None
+            A dict with the keys of `STREAM_PARAMETERS` (None where not applicable, e.g. width for audio)
+            and "duration" (seconds), or None if probing failed.
+        """
+        if self.ffprobe_path is None:
+            return None
+
+        command = [
+            self.ffprobe_path,
+            "-v", "error",
+            "-select_streams", stream,
+            "-show_entries", "stream=codec_name,pix_fmt,profile,level,width,height,r_frame_rate,time_base,duration:format=duration",
+            "-of", "json",
+            path
+        ]
+        try:
+            result = subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            info = json.loads(result.stdout)
+            streams = info.get("streams") or [{}]
+            # Stream duration is missing for some containers, so fall back to the container duration
+            duration = streams[0].get("duration") or info.get("format", {}).get("duration")
+            info = {key: streams[0].get(key) for key in self.STREAM_PARAMETERS}
+            info["duration"] = float(duration) if duration is not None else None
+            return info
+        except (subprocess.CalledProcessError, ValueError, OSError) as e:
+            print(f"⚠️ Could not probe {path}: {e}")
+            return None
+
+    def _can_stream_copy(self, jobs, executor):
+        """
+        Returns True if every clip's video can be copied without re-encoding.
+
+        That needs each narration to fit within its video (so no freeze-frame padding is needed),
+        H.264/yuv420p video, and identical `STREAM_PARAMETERS` across all clips, since the clips
+        are joined by the concat demuxer with stream copy. Prints why not when a clip prevents it.
+
+        Parameters:
+        ----------
+        jobs : list
+            (video_path, audio_path, processed_clip) tuples.
+        executor : concurrent.futures.Executor
+            Runs the FFprobe calls concurrently.
+        """
+        if not jobs or self.ffprobe_path is None:
+            return False
+        video_infos = list(executor.map(lambda job: self._probe_stream(job[0], "v:0"), jobs))
+        audio_infos = list(executor.map(lambda job: self._probe_stream(job[1], "a:0"), jobs))
+        for (video_path, _, _), video_info, audio_info in zip(jobs, video_infos, audio_infos):
+            if not video_info or not audio_info or video_info["duration"] is None or audio_info["duration"] is None:
+                reason = f"could not probe {video_path} or its narration"
+            elif video_info["codec_name"] != "h264" or video_info["pix_fmt"] != "yuv420p":
+                reason = f"{video_path} is not H.264/yuv420p"
+            elif audio_info["duration"] > video_info["duration"]:
+                reason = f"the narration of {video_path} is longer than the clip"
+            else:
+                continue
+            print(f"⚠️ Re-encoding every clip: {reason}")
+            return False
+        parameters = {tuple(info[key] for key in self.STREAM_PARAMETERS) for info in video_infos}
+        if len(parameters) > 1:
+            print("⚠️ Re-encoding every clip: the clips have different stream parameters")
+            return False
+        return True
+
+    def _process_summary_clip(self, video_path, audio_path, processed_clip, copy_video=False):
+        """
+        Replaces the audio of one clip with its narration, freezing the last frame if the narration is longer.
+        When `copy_video` is True, the video stream is copied instead of re-encoded; the caller checks
+        with `_can_stream_copy` that the narration fits and the clips can be concatenated.
+
+        Returns:
+        -------
+        bool
+            True if FFmpeg produced `processed_clip`, otherwise False.
+        """
+        if copy_video:
+            # Narration fits the clip: keep the original video stream and trim it to the audio
+            video_args = ["-c:v", "copy"]
+        else:
+            video_args = [
                 "-c:v", "libx264",       # Video codec
                 "-preset", "ultrafast",  # Fast processing
-                "-c:a", "aac",           # Audio codec
-                "-b:a", "192k",          # High-quality audio bitrate
-                "-strict", "experimental",
-                "-shortest",             # Trim video if longer
+                "-pix_fmt", "yuv420p",   # Widely playable pixel format
                 "-vf", "tpad=stop_mode=clone:stop_duration=5",  # Freeze last frame if audio is longer
-                processed_clip
             ]
 
-            try:
-                #print(f"🎥 Processing clips and audio")
-                subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                print(f"✅ Processed: {processed_clip}")
-                processed_clips.append(processed_clip)
-                processed_audios.append(audio_path)  # Track audio for deletion
-            except subprocess.CalledProcessError as e:
-                print(f"❌ Error processing {video_path}: {e.stderr.decode('utf-8')}")
-
-        # Ensure there are clips to concatenate
-        if not processed_clips:
-            print("❌ No valid clips processed. Cannot create summary video.")
+        # FFmpeg command to replace audio and handle duration mismatches
+        command = [
+            self.ffmpeg_path,
+            "-y",  # ✅ Forces overwrite to prevent FFmpeg from waiting for input
+            "-i", video_path,        # Input video
+            "-i", audio_path,        # Input audio
+            "-map", "0:v:0",         # Use first video stream
+            "-map", "1:a:0",         # Use first audio stream
+            *video_args,
+            "-c:a", "aac",           # Audio codec
+            "-b:a", "192k",          # High-quality audio bitrate
+            "-strict", "experimental",
+            "-shortest",             # Trim video if longer
+            processed_clip
+        ]
+
+        try:
+            subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            print(f"✅ Processed ({'stream copy' if copy_video else 're-encoded'}): {processed_clip}")
+            return True
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Error processing {video_path}: {e.stderr.decode('utf-8')}")
             return False
 
-        # Write processed clips to concatenation list
-        with open(concat_list_path, "w") as f:
-            for clip in processed_clips:
-                f.write(f"file '{clip.replace(os.sep, '/')}'\n")  # ✅ Works everywhere
+    def _concatenate_clips(self, processed_clips, file_path):
+        """
+        Concatenates processed clips, in the given order, into the final video with stream copy.
 
+        Returns:
+        -------
+        bool
+            True if the final video was written, otherwise False.
+        """
+        # Temporary file to store video list for concatenation
+        with tempfile.NamedTemporaryFile(delete=False, mode="w", suffix=".txt") as concat_list_file:
+            concat_list_path = concat_list_file.name
+            for clip in processed_clips:
+                concat_list_file.write(f"file '{clip.replace(os.sep, '/')}'\n")  # ✅ Works everywhere
 
         # FFmpeg command to concatenate processed clips into final video
         concat_command = [
@@ -381,22 +671,6 @@ class MovieAI(GenAI):
         try:
             subprocess.run(concat_command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
             print(f"🎬 Final movie created: {file_path}")
-
-            # ✅ Cleanup: Delete processed clips and audio files after successful video creation
-            for clip in processed_clips:
-                try:
-                    os.remove(clip)
-                    print(f"🗑️ Deleted processed clip: {clip}")
-                except Exception as e:
-                    print(f"⚠️ Failed to delete {clip}: {e}")
-
-            for audio in processed_audios:
-                try:
-                    os.remove(audio)
-                    print(f"🗑️ Deleted processed audio: {audio}")
-                except Exception as e:
-                    print(f"⚠️ Failed to delete {audio}: {e}")
-
             return True
 
         except subprocess.CalledProcessError as e:
@@ -406,4 +680,3 @@ class MovieAI(GenAI):
         finally:
             # Cleanup temporary concat list file
             os.remove(concat_list_path)
-
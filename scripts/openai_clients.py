@@ -0,0 +1,63 @@
+import os
+import asyncio
+import threading
+import weakref
+import openai
+
+# Process-wide client pools. Each client owns an httpx connection pool, so reusing one
+# client keeps TLS connections warm instead of paying connection setup on every call.
+_lock = threading.Lock()
+_clients = {}  # api_key -> openai.OpenAI
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> {api_key: openai.AsyncOpenAI}
+
+
+def get_openai_client(api_key=None):
+    """
+    Returns a shared synchronous OpenAI client for `api_key`, creating it on first use.
+
+    Parameters:
+    ----------
+    api_key : str, optional
+        The OpenAI API key. Defaults to the OPENAI_API_KEY environment variable.
+
+    Returns:
+    -------
+    openai.OpenAI
+        A client shared by every caller in this process that uses the same key.
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    with _lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = openai.OpenAI(api_key=api_key)
+            _clients[api_key] = client
+    return client
+
+
+def get_async_openai_client(api_key=None):
+    """
+    Returns a shared asynchronous OpenAI client for `api_key` and the running event loop.
+
+    Async connection pools are tied to the event loop that created them, so one client is kept
+    per loop. The client is dropped automatically when its loop is garbage collected.
+    Must be called from inside a coroutine.
+
+    Parameters:
+    ----------
+    api_key : str, optional
+        The OpenAI API key. Defaults to the OPENAI_API_KEY environment variable.
+
+    Returns:
+    -------
+    openai.AsyncOpenAI
+        A client shared by every coroutine on the current loop that uses the same key.
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    loop = asyncio.get_running_loop()
+    with _lock:
+        loop_clients = _async_clients.setdefault(loop, {})
+        client = loop_clients.get(api_key)
+        if client is None:
+            client = openai.AsyncOpenAI(api_key=api_key)
+            loop_clients[api_key] = client
+    return client
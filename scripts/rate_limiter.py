@@ -0,0 +1,357 @@
+import re
+import time
+import asyncio
+import random
+import threading
+import openai
+import requests
+
+# Status codes worth retrying: request timeout, conflict, rate limit, and server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+# Network failures worth retrying, whatever client raised them
+TRANSIENT_ERRORS = (openai.APIConnectionError, requests.ConnectionError, requests.Timeout)
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket refilled continuously at `rate_per_minute`.
+
+    The bucket holds at most one minute's worth of tokens, so a burst can use a whole minute's
+    budget at once, and then callers are paced at the sustained rate.
+    """
+
+    def __init__(self, rate_per_minute):
+        self._lock = threading.Lock()
+        self.rate_per_minute = float(rate_per_minute)
+        self.tokens = self.rate_per_minute
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.rate_per_minute, self.tokens + (now - self._updated) * self.rate_per_minute / 60)
+        self._updated = now
+
+    def try_acquire(self, amount=1):
+        """
+        Takes `amount` tokens if they are available, without waiting.
+
+        Requests larger than the bucket are capped at its size, so they wait for a full bucket
+        instead of forever.
+
+        Returns:
+        -------
+        float
+            0.0 if the tokens were taken, otherwise the seconds until they will be available.
+        """
+        with self._lock:
+            self._refill()
+            amount = min(amount, self.rate_per_minute)
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) * 60 / self.rate_per_minute
+
+    def acquire(self, amount=1):
+        """
+        Takes `amount` tokens, blocking until they are available.
+
+        Returns:
+        -------
+        float
+            Seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            delay = self.try_acquire(amount)
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    async def acquire_async(self, amount=1):
+        """Takes `amount` tokens like `acquire`, but waits with `asyncio.sleep` so the event loop keeps running."""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire(amount)
+            if not delay:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def set_rate(self, rate_per_minute):
+        """Changes the sustained rate, keeping the tokens already accumulated (up to the new size)."""
+        with self._lock:
+            self._refill()
+            self.rate_per_minute = float(rate_per_minute)
+            self.tokens = min(self.tokens, self.rate_per_minute)
+
+    def limit_to(self, remaining):
+        """Lowers the available tokens to what the server reports as remaining."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, float(remaining))
+
+
+class RateLimitScheduler:
+    """
+    Paces and retries API calls so they run at an account's real rate limits.
+
+    Calls are grouped by a rate key (an OpenAI model name, "elevenlabs", ...). Each key can have a
+    requests-per-minute and a tokens-per-minute token bucket. Buckets can be configured with
+    `set_limits`, and are configured automatically from OpenAI's `x-ratelimit-*` response headers
+    via `update_from_headers`, so no tier-specific numbers need to be hard-coded.
+
+    Failed calls are retried when the error is transient (HTTP 408/409/429/5xx or a network error):
+    - A `Retry-After` (or `retry-after-ms`) header is honoured, and pauses every caller of the
+      same rate key, since they would all be rejected until then.
+    - Otherwise the delay is jittered exponential backoff ("full jitter"), so concurrent callers
+      that failed together do not retry together.
+    A 429 caused by an exhausted quota (`insufficient_quota`) is not retried.
+
+    One scheduler is shared process-wide through `get_scheduler()`, so all GenAI, MovieAI and
+    ElevenLabsAPI instances (and their worker threads) share the same budgets. Coroutines
+    (AsyncGenAI) use `call_async`, which waits without blocking the event loop.
+
+    Example:
+    -------
+    >>> scheduler = get_scheduler()
+    >>> scheduler.set_limits("gpt-4o", rpm=500, tpm=30000)
+    >>> completion = scheduler.call("gpt-4o", client.chat.completions.create, tokens=1200, model="gpt-4o", messages=messages)
+    """
+
+    def __init__(self, max_retries=5, base_delay=1.0, max_delay=60.0):
+        """
+        Initializes the scheduler.
+
+        Parameters:
+        ----------
+        max_retries : int, optional
+            Number of times a call failing with a transient error is retried (default 5).
+        base_delay : float, optional
+            Upper bound of the first backoff delay in seconds; it doubles on each retry (default 1.0).
+        max_delay : float, optional
+            Upper bound of any single delay in seconds, Retry-After included (default 60.0).
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._request_buckets = {}  # rate key -> TokenBucket of requests per minute
+        self._token_buckets = {}  # rate key -> TokenBucket of tokens per minute
+        self._paused_until = {}  # rate key -> time.monotonic() deadline set by Retry-After
+
+    def set_limits(self, rate_key, rpm=None, tpm=None):
+        """
+        Sets the requests-per-minute and/or tokens-per-minute limit of a rate key.
+
+        Parameters:
+        ----------
+        rate_key : str
+            The rate key, e.g. a model name.
+        rpm : float, optional
+            Requests per minute. None leaves the current setting unchanged.
+        tpm : float, optional
+            Tokens per minute. None leaves the current setting unchanged.
+        """
+        with self._lock:
+            for buckets, rate in ((self._request_buckets, rpm), (self._token_buckets, tpm)):
+                if rate is None:
+                    continue
+                if rate_key in buckets:
+                    buckets[rate_key].set_rate(rate)
+                else:
+                    buckets[rate_key] = TokenBucket(rate)
+
+    def update_from_headers(self, rate_key, headers):
+        """
+        Configures the buckets of `rate_key` from OpenAI rate limit headers.
+
+        `x-ratelimit-limit-requests` and `x-ratelimit-limit-tokens` set the bucket sizes;
+        `x-ratelimit-remaining-requests` and `x-ratelimit-remaining-tokens` bring the buckets in line
+        with the server's count, which also corrects for estimated token counts.
+        """
+        if not headers:
+            return
+        limit_requests = _header_float(headers, "x-ratelimit-limit-requests")
+        limit_tokens = _header_float(headers, "x-ratelimit-limit-tokens")
+        if limit_requests is not None or limit_tokens is not None:
+            self.set_limits(rate_key, rpm=limit_requests, tpm=limit_tokens)
+
+        remaining_requests = _header_float(headers, "x-ratelimit-remaining-requests")
+        remaining_tokens = _header_float(headers, "x-ratelimit-remaining-tokens")
+        with self._lock:
+            request_bucket = self._request_buckets.get(rate_key)
+            token_bucket = self._token_buckets.get(rate_key)
+        if request_bucket is not None and remaining_requests is not None:
+            request_bucket.limit_to(remaining_requests)
+        if token_bucket is not None and remaining_tokens is not None:
+            token_bucket.limit_to(remaining_tokens)
+
+    def acquire(self, rate_key, tokens=0):
+        """
+        Blocks until a request of `tokens` estimated tokens may be sent under `rate_key`.
+
+        Returns:
+        -------
+        float
+            Seconds spent waiting.
+        """
+        pause, request_bucket, token_bucket = self._limits(rate_key)
+        waited = 0.0
+        if pause > 0:
+            time.sleep(pause)
+            waited += pause
+        if request_bucket is not None:
+            waited += request_bucket.acquire(1)
+        if token_bucket is not None and tokens:
+            waited += token_bucket.acquire(tokens)
+        return waited
+
+    async def acquire_async(self, rate_key, tokens=0):
+        """Like `acquire`, but waits with `asyncio.sleep` so the event loop keeps running."""
+        pause, request_bucket, token_bucket = self._limits(rate_key)
+        waited = 0.0
+        if pause > 0:
+            await asyncio.sleep(pause)
+            waited += pause
+        if request_bucket is not None:
+            waited += await request_bucket.acquire_async(1)
+        if token_bucket is not None and tokens:
+            waited += await token_bucket.acquire_async(tokens)
+        return waited
+
+    def _limits(self, rate_key):
+        """Returns (seconds left of a Retry-After pause, requests bucket, tokens bucket) of a rate key."""
+        with self._lock:
+            paused_until = self._paused_until.get(rate_key, 0)
+            request_bucket = self._request_buckets.get(rate_key)
+            token_bucket = self._token_buckets.get(rate_key)
+        return paused_until - time.monotonic(), request_bucket, token_bucket
+
+    def call(self, rate_key, fn, *args, tokens=0, **kwargs):
+        """
+        Calls `fn(*args, **kwargs)` within the limits of `rate_key`, retrying transient failures.
+
+        Parameters:
+        ----------
+        rate_key : str
+            The rate key the call counts against, e.g. the model name.
+        fn : callable
+            The API call.
+        tokens : int, optional
+            Estimated tokens used by the request (prompt plus expected completion). Defaults to 0.
+
+        Returns:
+        -------
+        The return value of `fn`.
+
+        Raises:
+        ------
+        Exception
+            The last error of `fn`, if it is not transient or retries are exhausted.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.acquire(rate_key, tokens)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                time.sleep(self._retry_delay(rate_key, attempt, e))
+
+    async def call_async(self, rate_key, fn, *args, tokens=0, **kwargs):
+        """
+        Awaits `fn(*args, **kwargs)` within the limits of `rate_key`, retrying transient failures.
+
+        Same as `call` for a coroutine function `fn`; pacing and backoff waits do not block the event loop.
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.acquire_async(rate_key, tokens)
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                await asyncio.sleep(self._retry_delay(rate_key, attempt, e))
+
+    def _retry_delay(self, rate_key, attempt, error):
+        """Returns the delay before retrying after `error`. A Retry-After header also pauses the whole rate key."""
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = min(retry_after, self.max_delay)
+            # Everyone using this key would be rejected too: pause them all
+            with self._lock:
+                deadline = time.monotonic() + delay
+                self._paused_until[rate_key] = max(self._paused_until.get(rate_key, 0), deadline)
+        else:
+            delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+        print(f"⚠️ {rate_key}: retrying in {delay:.1f}s after error: {error}")
+        return delay
+
+
+def backoff_delay(attempt, base_delay=1.0, max_delay=60.0):
+    """Returns a "full jitter" exponential backoff delay: uniform in [0, min(max_delay, base_delay * 2**attempt)]."""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def is_retryable(error):
+    """
+    Tells whether an API error is transient: a rate limit, timeout, server error or network failure.
+
+    Works with errors from the OpenAI SDK, the ElevenLabs SDK and `requests`.
+    """
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    if getattr(error, "code", None) == "insufficient_quota":
+        return False  # Billing problem: retrying cannot succeed
+    status_code = _status_code(error)
+    return status_code is not None and (status_code in RETRYABLE_STATUS_CODES or status_code >= 500)
+
+
+def _status_code(error):
+    """HTTP status code of an SDK or `requests` error, if any."""
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code
+
+
+def _retry_after(error):
+    """Seconds to wait according to the error's Retry-After headers, or None."""
+    headers = getattr(error, "headers", None) or getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    retry_after_ms = _header_float(headers, "retry-after-ms")
+    if retry_after_ms is not None:
+        return retry_after_ms / 1000
+    return _header_float(headers, "retry-after")  # An HTTP-date value is ignored (None)
+
+
+def _header_float(headers, name):
+    """Reads a numeric header, accepting OpenAI duration values like '6m0s' or '20ms'. Returns None if absent or invalid."""
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    parts = re.findall(r"([\d.]+)(ms|s|m|h)", str(value))
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Returns the process-wide RateLimitScheduler shared by all API wrappers."""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RateLimitScheduler()
+    return _default_scheduler
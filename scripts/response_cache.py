@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+
+class ResponseCache:
+    """
+    A persistent, content-addressed cache for OpenAI API responses backed by SQLite.
+
+    Each entry is keyed by a SHA-256 hash of the full request (model, instructions,
+    prompt, temperature, output format, ...), so repeated identical calls can be served
+    from disk instead of paying API latency and cost again.
+
+    Attributes:
+    ----------
+    path : str
+        Path to the SQLite database file.
+    ttl_seconds : float or None
+        Entries older than this many seconds are treated as expired. `None` disables expiry.
+    max_entries : int or None
+        Maximum number of entries to keep. The least recently used entries are evicted
+        once the limit is exceeded. `None` disables size eviction.
+    hits : int
+        Number of lookups served from the cache.
+    misses : int
+        Number of lookups that were not found (or had expired).
+    """
+
+    def __init__(self, path="genai_cache.sqlite", ttl_seconds=None, max_entries=None):
+        """
+        Opens (or creates) the cache database.
+
+        Parameters:
+        ----------
+        path : str, optional (default='genai_cache.sqlite')
+            Path to the SQLite database file. Parent directories are created if needed.
+        ttl_seconds : float, optional
+            Time-to-live of each entry in seconds. Defaults to no expiry.
+        max_entries : int, optional
+            Maximum number of entries before least recently used ones are evicted.
+            Defaults to no limit.
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        # One connection shared across threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                       key TEXT PRIMARY KEY,
+                       value TEXT NOT NULL,
+                       created_at REAL NOT NULL,
+                       accessed_at REAL NOT NULL
+                   )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses (accessed_at)"
+            )
+
+    @staticmethod
+    def make_key(**request):
+        """
+        Builds a content-addressed key from the request parameters.
+
+        Parameters:
+        ----------
+        **request
+            Any JSON-serializable request parameters, e.g. method, model, prompt.
+
+        Returns:
+        -------
+        str
+            A hex SHA-256 digest of the canonical JSON encoding of the request.
+        """
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Looks up a cached response.
+
+        Parameters:
+        ----------
+        key : str
+            Key returned by `make_key`.
+
+        Returns:
+        -------
+        object or None
+            The cached value, or `None` on a miss or if the entry has expired.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        """
+        Stores a response and evicts old entries if the cache is over its size limit.
+
+        Parameters:
+        ----------
+        key : str
+            Key returned by `make_key`.
+        value : object
+            Any JSON-serializable value (text, lists of floats, dicts, ...).
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            self._evict()
+
+    def _evict(self):
+        """Removes expired entries and, if needed, the least recently used ones. Caller holds the lock."""
+        if self.ttl_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+        if self.max_entries is not None:
+            self._conn.execute(
+                """DELETE FROM responses WHERE key IN (
+                       SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                   )""",
+                (int(self.max_entries),),
+            )
+
+    def clear(self):
+        """Deletes every entry and resets the hit/miss counters."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """
+        Reports cache usage.
+
+        Returns:
+        -------
+        dict
+            A dictionary with keys "hits", "misses", "hit_rate" and "entries".
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+    def close(self):
+        """Closes the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,314 @@
+import io
+import os
+import re
+import glob
+import json
+import shutil
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+# Bump when the processing in `parse_tweets_csv` changes, so cached frames are rebuilt
+TWEETS_FORMAT_VERSION = 1
+
+REQUIRED_COLUMNS = ['text', 'view_count', 'created_at', 'favorite_count']
+
+# Explicit dtypes for TwExportly columns, so pandas does not infer them cell by cell.
+# Columns that are absent from a file are ignored.
+STRING_COLUMNS = ['tweet_id', 'text', 'language', 'type', 'client', 'hashtags', 'urls', 'media_type', 'media_urls']
+NUMERIC_COLUMNS = ['favorite_count', 'view_count', 'retweet_count', 'reply_count', 'bookmark_count']
+
+# Column layout of every file in the corpus store, so all partitions share one schema
+CORPUS_SCHEMA = {
+    **{col: 'string' for col in STRING_COLUMNS},
+    **{col: 'float64' for col in NUMERIC_COLUMNS},
+    'created_at': 'datetime64[us]',
+    'engagement': 'float64',
+    'export_date': 'datetime64[us]',
+}
+
+# TwExportly_<account>_tweets_<YYYY_MM_DD>.csv
+EXPORT_FILENAME_PATTERN = re.compile(r"^TwExportly_(?P<account>.+)_tweets_(?P<date>\d{4}_\d{2}_\d{2})\.csv$")
+
+
+def parse_tweets_csv(source):
+    """
+    Parses a TwExportly-style tweet CSV and derives the engagement column.
+
+    Parameters:
+    ----------
+    source : str or file-like
+        Path to the CSV file, or a file-like object with its contents.
+
+    Returns:
+    -------
+    pd.DataFrame
+        The tweets with `created_at` as datetimes, numeric count columns, and an `engagement`
+        column (favorite_count / view_count), sorted by engagement in descending order.
+
+    Raises:
+    ------
+    ValueError
+        If any of the required columns (text, view_count, created_at, favorite_count) is missing.
+    """
+    dtypes = {col: 'string' for col in STRING_COLUMNS}
+    dtypes.update({col: 'float64' for col in NUMERIC_COLUMNS})
+    try:
+        df = pd.read_csv(source, dtype=dtypes)
+    except ValueError:
+        # A numeric column holds non-numeric values: parse it as text and coerce below
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        df = pd.read_csv(source, dtype={col: 'string' for col in STRING_COLUMNS})
+
+    # Validate required columns
+    missing_cols = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_cols:
+        raise ValueError(f"Missing required columns: {', '.join(missing_cols)}")
+
+    # Convert created_at to datetime. ISO 8601 avoids per-cell format inference;
+    # fall back to inference for exports that use another format.
+    created_at = pd.to_datetime(df['created_at'], format='ISO8601', errors='coerce')
+    if created_at.isna().all() and df['created_at'].notna().any():
+        created_at = pd.to_datetime(df['created_at'], errors='coerce')
+    df['created_at'] = created_at
+
+    # Ensure numeric columns are numeric (a no-op when the typed parse succeeded)
+    df['favorite_count'] = pd.to_numeric(df['favorite_count'], errors='coerce')
+    df['view_count'] = pd.to_numeric(df['view_count'], errors='coerce')
+
+    # Calculate engagement (favorite_count / view_count)
+    df['engagement'] = df['favorite_count'] / df['view_count'].replace(0, 1)  # Avoid division by zero
+    df['engagement'] = df['engagement'].fillna(0)  # Fill NaN with 0
+
+    # Sort by engagement descending
+    df = df.sort_values('engagement', ascending=False).reset_index(drop=True)
+
+    return df
+
+
+def content_hash(content):
+    """
+    Returns the cache key for raw CSV bytes: a SHA-256 of the content and the processing version.
+    """
+    digest = hashlib.sha256(content)
+    digest.update(f"v{TWEETS_FORMAT_VERSION}".encode())
+    return digest.hexdigest()
+
+
+def frame_hash(df, columns=('text', 'favorite_count', 'view_count')):
+    """
+    Returns a SHA-256 fingerprint of the given columns of a tweet frame, row order included.
+
+    Identifies a dataset whatever its source (an upload, or accounts selected from the corpus),
+    so results derived from it can be cached.
+    """
+    row_hashes = pd.util.hash_pandas_object(df[list(columns)], index=False)
+    digest = hashlib.sha256(row_hashes.to_numpy().tobytes())
+    digest.update(f"v{TWEETS_FORMAT_VERSION}".encode())
+    return digest.hexdigest()
+
+
+def load_tweets_cached(content, cache_dir):
+    """
+    Parses tweet CSV bytes, reusing a processed Parquet copy when the same content was parsed before.
+
+    Parameters:
+    ----------
+    content : bytes
+        Raw contents of the CSV file.
+    cache_dir : str
+        Directory holding processed frames, one `<content hash>.parquet` file per distinct upload.
+
+    Returns:
+    -------
+    pd.DataFrame
+        The processed tweets, as returned by `parse_tweets_csv`.
+
+    Notes:
+    -----
+    Parquet needs `pyarrow`. Without it, the CSV is parsed every time and nothing is written.
+    """
+    parquet_path = os.path.join(cache_dir, f"{content_hash(content)}.parquet")
+
+    if os.path.exists(parquet_path):
+        try:
+            return pd.read_parquet(parquet_path)
+        except (ImportError, OSError, ValueError):
+            pass  # Unreadable cache entry: rebuild it below
+
+    df = parse_tweets_csv(io.BytesIO(content))
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        df.to_parquet(parquet_path, index=False)
+    except (ImportError, OSError, ValueError):
+        pass  # Caching is best effort
+
+    return df
+
+
+def parse_export_filename(path):
+    """
+    Extracts the account and export date from a TwExportly file name.
+
+    Returns:
+    -------
+    tuple or None
+        (account, export date as pd.Timestamp), or None if the name does not match
+        `TwExportly_<account>_tweets_<YYYY_MM_DD>.csv`.
+    """
+    match = EXPORT_FILENAME_PATTERN.match(os.path.basename(path))
+    if not match:
+        return None
+    return match.group('account'), pd.Timestamp(match.group('date').replace('_', '-'))
+
+
+def _convert_corpus_file(csv_path, parquet_path, export_date):
+    """
+    Parses one export and writes it to the corpus store with the shared schema.
+    Runs in a worker process; returns the number of rows written.
+    """
+    df = parse_tweets_csv(csv_path)
+    df['export_date'] = export_date
+    for col, dtype in CORPUS_SCHEMA.items():
+        if col not in df.columns:
+            df[col] = pd.Series(pd.NA if dtype == 'string' else None, index=df.index)
+    df = df[list(CORPUS_SCHEMA)].astype(CORPUS_SCHEMA)
+
+    os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+    tmp_path = parquet_path + ".tmp"
+    try:
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, parquet_path)  # Never leave a half-written partition file behind
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return len(df)
+
+
+def load_corpus(data_dir="data/TwExportly", store_dir=None, max_workers=None, deduplicate=True, verbose=False):
+    """
+    Loads every TwExportly export in `data_dir` into one DataFrame with an `account` column.
+
+    Each CSV is converted to Parquet in a store partitioned by account
+    (`<store_dir>/account=<account>/<file name>.parquet`). A manifest records the size and
+    modification time of each source file, so repeated loads only re-parse new or changed
+    files, in parallel across processes. Partitions of deleted exports are removed, and so are
+    the partitions of changed exports that fail to parse, so their outdated tweets are not loaded.
+
+    Parameters:
+    ----------
+    data_dir : str, optional
+        Directory containing the TwExportly CSV files (default 'data/TwExportly').
+    store_dir : str, optional
+        Directory of the Parquet store. Defaults to `<data_dir>/.corpus_store`.
+    max_workers : int, optional
+        Number of worker processes used to parse changed files (default: one per CPU).
+    deduplicate : bool, optional
+        If True (default), a tweet that appears in several exports of the same account
+        is kept once, from the most recent export.
+    verbose : bool, optional
+        Whether to print which files were parsed (default: False).
+
+    Returns:
+    -------
+    pd.DataFrame
+        All tweets with the columns of `CORPUS_SCHEMA` plus a categorical `account` column,
+        sorted by engagement in descending order. Empty if there are no exports.
+    """
+    if store_dir is None:
+        store_dir = os.path.join(data_dir, ".corpus_store")
+    manifest_path = os.path.join(store_dir, "_manifest.json")  # "_" prefix: skipped by Parquet readers
+
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+    saved_manifest = dict(manifest)
+
+    # Scan the exports and find the ones that are new or changed since the last load
+    exports = {}
+    for csv_path in sorted(glob.glob(os.path.join(data_dir, "*.csv"))):
+        parsed = parse_export_filename(csv_path)
+        if parsed is None:
+            if verbose:
+                print(f"⚠️ Skipping {csv_path}: not a TwExportly file name")
+            continue
+        account, export_date = parsed
+        stat = os.stat(csv_path)
+        exports[os.path.basename(csv_path)] = {
+            "path": csv_path,
+            "account": account,
+            "export_date": export_date,
+            "signature": [stat.st_size, stat.st_mtime_ns],
+            "parquet_path": os.path.join(
+                store_dir, f"account={account}", os.path.basename(csv_path).replace(".csv", ".parquet")
+            ),
+        }
+
+    changed = [
+        name for name, export in exports.items()
+        if manifest.get(name) != export["signature"] or not os.path.exists(export["parquet_path"])
+    ]
+
+    # Remove partitions whose source export was deleted
+    for name in set(manifest) - set(exports):
+        parsed = parse_export_filename(name)
+        if parsed is not None:
+            stale_path = os.path.join(store_dir, f"account={parsed[0]}", name.replace(".csv", ".parquet"))
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+        manifest.pop(name)
+
+    if changed:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                name: executor.submit(
+                    _convert_corpus_file, exports[name]["path"], exports[name]["parquet_path"], exports[name]["export_date"]
+                )
+                for name in changed
+            }
+            for name, future in futures.items():
+                try:
+                    nrows = future.result()
+                    manifest[name] = exports[name]["signature"]
+                    if verbose:
+                        print(f"✅ Parsed {name} ({nrows} tweets)")
+                except Exception as e:
+                    manifest.pop(name, None)
+                    # Drop the partition of the previous version too: loading it would silently mix
+                    # outdated tweets into the corpus. The file is parsed again on the next load.
+                    removed = os.path.exists(exports[name]["parquet_path"])
+                    if removed:
+                        os.remove(exports[name]["parquet_path"])
+                    print(f"❌ Error parsing {name}: {e}" + (" (removed its previous partition)" if removed else ""))
+
+    # Deletions and failed parses change the manifest too, not only successful parses
+    if manifest != saved_manifest:
+        os.makedirs(store_dir, exist_ok=True)
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+    # Drop empty account partitions left by deleted exports
+    for account_dir in glob.glob(os.path.join(store_dir, "account=*")):
+        if not os.listdir(account_dir):
+            shutil.rmtree(account_dir)
+
+    if not any(name in manifest for name in exports):
+        return pd.DataFrame({**{col: pd.Series(dtype=dtype) for col, dtype in CORPUS_SCHEMA.items()},
+                             'account': pd.Series(dtype='category')})
+
+    df = pd.read_parquet(store_dir)
+    df['account'] = df['account'].astype('category')
+
+    if deduplicate:
+        df = df.sort_values('export_date', ascending=False, kind='stable')
+        has_id = df['tweet_id'].notna()
+        df = pd.concat([
+            df[has_id].drop_duplicates(subset=['account', 'tweet_id'], keep='first'),
+            df[~has_id],
+        ])
+
+    return df.sort_values('engagement', ascending=False, kind='stable').reset_index(drop=True)
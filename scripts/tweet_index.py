@@ -0,0 +1,412 @@
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+
+
+def text_key(text):
+    """Returns the index key of a tweet text: a SHA-1 of the text, so identical texts share one embedding."""
+    return hashlib.sha1(str(text).encode("utf-8")).hexdigest()
+
+
+class TweetIndex:
+    """
+    A persistent semantic search index over tweet embeddings.
+
+    Vectors are L2-normalized and stored in a memory-mapped NumPy file, so cosine similarity is
+    a plain matrix product and the index opens instantly without loading every vector into memory.
+    Each vector is stored under a string key (e.g. `text_key(text)` or a tweet id). Adding texts
+    only embeds keys that are not in the index yet, so re-indexing a grown corpus is incremental.
+
+    For large corpora, `build_ivf` adds an inverted-file (IVF) approximate index: vectors are
+    clustered with spherical k-means, and a query only scores the vectors of its `nprobe`
+    closest clusters.
+
+    Files in `path`:
+    - `vectors.npy`: the vector matrix (capacity grows by doubling; only the first `count` rows are used)
+    - `keys.json`: the key of each row
+    - `meta.json`: model, dimension, dtype and row count
+    - `ivf.npz`: IVF centroids and row assignments, if built
+
+    Example:
+    -------
+    >>> index = TweetIndex("tweet_index")
+    >>> index.add_texts(genai, df['text'].tolist())
+    >>> keys, scores = index.search(index.get_vectors([text_key(df['text'][0])]), k=10)
+    """
+
+    def __init__(self, path, model="text-embedding-3-small", dtype="float16"):
+        """
+        Opens (or creates) an index directory.
+
+        Parameters:
+        ----------
+        path : str
+            Directory holding the index files. Created if needed.
+        model : str, optional
+            Embedding model of the stored vectors (default 'text-embedding-3-small').
+        dtype : str, optional
+            Storage type of the vectors, 'float16' (default, half the disk and memory) or 'float32'.
+            Ignored when opening an existing index.
+
+        Raises:
+        ------
+        ValueError
+            If the existing index was built with a different embedding model.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._ivf = None
+        self._ivf_lists = None
+        os.makedirs(path, exist_ok=True)
+
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["model"] != model:
+                raise ValueError(f"Index at {path} holds '{meta['model']}' embeddings, not '{model}'.")
+            self.model = meta["model"]
+            self.dim = meta["dim"]
+            self.dtype = np.dtype(meta["dtype"])
+            self.count = meta["count"]
+            with open(os.path.join(path, "keys.json"), "r", encoding="utf-8") as f:
+                self.keys = json.load(f)[:self.count]
+        else:
+            self.keys = []
+            self.model = model
+            self.dim = None
+            self.dtype = np.dtype(dtype)
+            self.count = 0
+        self._positions = {key: i for i, key in enumerate(self.keys)}
+
+        ivf_path = os.path.join(path, "ivf.npz")
+        if os.path.exists(ivf_path):
+            with np.load(ivf_path) as ivf:
+                self._ivf = {"centroids": ivf["centroids"], "assignments": ivf["assignments"]}
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, key):
+        return key in self._positions
+
+    @property
+    def vectors(self):
+        """The stored vectors as a read-only memory-mapped array of shape (count, dim)."""
+        if self.count == 0:
+            return np.zeros((0, self.dim or 0), dtype=self.dtype)
+        if self._vectors is None:
+            self._vectors = np.load(os.path.join(self.path, "vectors.npy"), mmap_mode="r")
+        return self._vectors[:self.count]
+
+    def positions(self, keys):
+        """Returns the row of each key, or -1 for keys that are not in the index."""
+        return np.array([self._positions.get(key, -1) for key in keys], dtype=np.int64)
+
+    def get_vectors(self, keys):
+        """
+        Returns the stored vectors of `keys` as a float32 matrix.
+
+        Raises:
+        ------
+        KeyError
+            If any key is not in the index.
+        """
+        rows = self.positions(keys)
+        if (rows < 0).any():
+            raise KeyError(f"{int((rows < 0).sum())} key(s) not in the index.")
+        return np.asarray(self.vectors[rows], dtype=np.float32)
+
+    def add_vectors(self, keys, vectors):
+        """
+        Adds vectors under new keys. Keys already in the index are skipped.
+
+        Parameters:
+        ----------
+        keys : list of str
+            One key per vector.
+        vectors : np.ndarray
+            Matrix of shape (len(keys), dim). Rows are L2-normalized before storage.
+
+        Returns:
+        -------
+        int
+            The number of vectors added.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(keys) != len(vectors):
+            raise ValueError("keys and vectors must have the same length.")
+
+        with self._lock:
+            # Keep the first occurrence of each key that is not indexed yet
+            new_rows = {}
+            for i, key in enumerate(keys):
+                if key not in self._positions and key not in new_rows:
+                    new_rows[key] = i
+            if not new_rows:
+                return 0
+
+            new_vectors = vectors[list(new_rows.values())]
+            if self.dim is None:
+                self.dim = new_vectors.shape[1]
+            elif new_vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected vectors of dimension {self.dim}, got {new_vectors.shape[1]}.")
+            norms = np.linalg.norm(new_vectors, axis=1, keepdims=True)
+            new_vectors = new_vectors / np.where(norms == 0, 1, norms)
+
+            start = self.count
+            end = start + len(new_vectors)
+            storage = self._writable_storage(end)
+            storage[start:end] = new_vectors.astype(self.dtype)
+            storage.flush()
+            del storage
+
+            # Vectors added after the IVF was built join their nearest existing cluster
+            if self._ivf is not None:
+                assignments = np.argmax(new_vectors @ self._ivf["centroids"].T, axis=1).astype(np.int32)
+                self._ivf["assignments"] = np.concatenate([self._ivf["assignments"], assignments])
+                self._ivf_lists = None
+
+            for key in new_rows:
+                self._positions[key] = len(self.keys)
+                self.keys.append(key)
+            self.count = end
+            self._vectors = None
+            self._save()
+            return len(new_rows)
+
+    def add_texts(self, genai, texts, keys=None, batch_size=256):
+        """
+        Embeds and adds texts whose keys are not in the index yet.
+
+        Parameters:
+        ----------
+        genai : GenAI or Embedder
+            Used for `get_embeddings`, which packs many texts into each API request.
+            `scripts.embeddings.Embedder` does this without GenAI's video and document dependencies.
+        texts : list of str
+            Texts to index.
+        keys : list of str, optional
+            One key per text. Defaults to `text_key(text)`.
+        batch_size : int, optional
+            Maximum number of texts per embedding request (default 256).
+
+        Returns:
+        -------
+        int
+            The number of texts embedded and added.
+        """
+        texts = ["" if pd.isna(text) else str(text) for text in texts]
+        if keys is None:
+            keys = [text_key(text) for text in texts]
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in self._positions and key not in missing:
+                missing[key] = text
+        if not missing:
+            return 0
+
+        vectors = genai.get_embeddings(list(missing.values()), model=self.model, batch_size=batch_size)
+        return self.add_vectors(list(missing), vectors)
+
+    def search(self, queries, k=10, subset=None, nprobe=None, block_size=65536):
+        """
+        Finds the `k` stored vectors most similar (cosine) to each query.
+
+        Parameters:
+        ----------
+        queries : np.ndarray
+            A query vector of shape (dim,), or a matrix of shape (n_queries, dim).
+        k : int, optional
+            Number of results per query (default 10).
+        subset : array-like of int, optional
+            Restrict the search to these rows (e.g. `positions(keys)` of one dataset).
+        nprobe : int, optional
+            Use the IVF index and only score the vectors of the `nprobe` closest clusters.
+            Defaults to None (exact search). Ignored if no IVF index was built.
+        block_size : int, optional
+            Rows scored per matrix product, bounding memory use on large indexes (default 65536).
+
+        Returns:
+        -------
+        tuple
+            A tuple containing:
+            - The keys of the results, an array of shape (n_queries, k') in descending similarity
+            - Their cosine similarities, a float32 array of the same shape
+            where k' = min(k, number of candidate vectors), the largest over all queries with `nprobe`.
+            A query with fewer candidates (e.g. probing sparse clusters) is padded with key None and
+            similarity -inf. A 1-D query gives 1-D arrays.
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        single = queries.ndim == 1
+        queries = np.atleast_2d(queries)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1, norms)
+
+        if subset is not None:
+            candidates = [np.asarray(subset, dtype=np.int64)] * len(queries)
+        elif nprobe is not None and self._ivf is not None:
+            candidates = self._probe(queries, nprobe)
+        else:
+            candidates = None
+
+        if candidates is None:
+            rows, scores = self._search_exact(queries, k, block_size)
+        else:
+            rows, scores = self._search_candidates(queries, k, candidates)
+
+        keys = np.empty(rows.shape, dtype=object)
+        found = rows >= 0
+        keys[found] = np.array(self.keys, dtype=object)[rows[found]]
+        if single:
+            return keys[0], scores[0]
+        return keys, scores
+
+    def _search_exact(self, queries, k, block_size):
+        """Scores every stored vector block by block, keeping a running top-k per query."""
+        vectors = self.vectors
+        k = min(k, len(vectors))
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        best_scores = np.zeros((len(queries), 0), dtype=np.float32)
+
+        for start in range(0, len(vectors), block_size):
+            block_scores = queries @ np.asarray(vectors[start:start + block_size], dtype=np.float32).T
+            rows = np.broadcast_to(np.arange(start, start + block_scores.shape[1]), block_scores.shape)
+            all_scores = np.concatenate([best_scores, block_scores], axis=1)
+            all_rows = np.concatenate([best_rows, rows], axis=1)
+            top = _top_k(all_scores, k)
+            best_scores = np.take_along_axis(all_scores, top, axis=1)
+            best_rows = np.take_along_axis(all_rows, top, axis=1)
+
+        return best_rows, best_scores
+
+    def _search_candidates(self, queries, k, candidates):
+        """Scores each query against its own candidate rows. Short rows are padded with row -1 and score -inf."""
+        vectors = self.vectors
+        k = min(k, max((len(c) for c in candidates), default=0))
+        rows = np.full((len(queries), k), -1, dtype=np.int64)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for i, candidate_rows in enumerate(candidates):
+            k_i = min(k, len(candidate_rows))
+            if k_i == 0:
+                continue
+            candidate_scores = np.asarray(vectors[candidate_rows], dtype=np.float32) @ queries[i]
+            top = _top_k(candidate_scores[None, :], k_i)[0]
+            rows[i, :k_i] = candidate_rows[top]
+            scores[i, :k_i] = candidate_scores[top]
+        return rows, scores
+
+    def build_ivf(self, n_lists=None, n_iter=10, sample_size=50000, seed=0):
+        """
+        Builds an inverted-file approximate index with spherical k-means.
+
+        Parameters:
+        ----------
+        n_lists : int, optional
+            Number of clusters. Defaults to about 4 * sqrt(count).
+        n_iter : int, optional
+            Number of k-means iterations (default 10).
+        sample_size : int, optional
+            Number of vectors used to fit the centroids (default 50,000).
+        seed : int, optional
+            Seed of the sampling and initialization (default 0).
+
+        Returns:
+        -------
+        int
+            The number of clusters.
+        """
+        with self._lock:
+            vectors = self.vectors
+            if len(vectors) == 0:
+                raise ValueError("Cannot build an IVF index on an empty index.")
+            if n_lists is None:
+                n_lists = int(4 * np.sqrt(len(vectors)))
+            n_lists = max(1, min(n_lists, len(vectors)))
+
+            rng = np.random.default_rng(seed)
+            sample_rows = np.sort(rng.choice(len(vectors), size=min(sample_size, len(vectors)), replace=False))
+            sample = np.asarray(vectors[sample_rows], dtype=np.float32)
+            centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+
+            for _ in range(n_iter):
+                labels = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, sample)
+                norms = np.linalg.norm(sums, axis=1, keepdims=True)
+                # Empty clusters keep their previous centroid
+                centroids = np.where(norms > 0, sums / np.where(norms == 0, 1, norms), centroids)
+
+            assignments = np.concatenate([
+                np.argmax(np.asarray(vectors[start:start + 65536], dtype=np.float32) @ centroids.T, axis=1)
+                for start in range(0, len(vectors), 65536)
+            ]).astype(np.int32)
+
+            self._ivf = {"centroids": centroids, "assignments": assignments}
+            self._ivf_lists = None
+            np.savez(os.path.join(self.path, "ivf.npz"), centroids=centroids, assignments=assignments)
+            return n_lists
+
+    def _probe(self, queries, nprobe):
+        """Returns, per query, the rows of its `nprobe` closest clusters."""
+        if self._ivf_lists is None:
+            # Rows grouped by cluster: order[offsets[c]:offsets[c + 1]] are the rows of cluster c
+            assignments = self._ivf["assignments"]
+            order = np.argsort(assignments, kind="stable")
+            offsets = np.searchsorted(assignments[order], np.arange(len(self._ivf["centroids"]) + 1))
+            self._ivf_lists = (order, offsets)
+        order, offsets = self._ivf_lists
+
+        centroids = self._ivf["centroids"]
+        nprobe = min(nprobe, len(centroids))
+        closest = _top_k(queries @ centroids.T, nprobe)
+        return [np.concatenate([order[offsets[c]:offsets[c + 1]] for c in clusters]) for clusters in closest]
+
+    def _writable_storage(self, needed_rows):
+        """Returns a writable memmap with room for `needed_rows`, doubling the file's capacity when full."""
+        vectors_path = os.path.join(self.path, "vectors.npy")
+        self._vectors = None  # Release the read-only map before the file is replaced
+
+        capacity = 0
+        if os.path.exists(vectors_path):
+            capacity = np.load(vectors_path, mmap_mode="r").shape[0]
+        if needed_rows <= capacity:
+            return np.load(vectors_path, mmap_mode="r+")
+
+        new_capacity = max(needed_rows, 2 * capacity, 1024)
+        tmp_path = vectors_path + ".tmp"
+        storage = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=self.dtype, shape=(new_capacity, self.dim))
+        if self.count:
+            old = np.load(vectors_path, mmap_mode="r")
+            storage[:self.count] = old[:self.count]
+            del old
+        storage.flush()
+        del storage
+        os.replace(tmp_path, vectors_path)
+        return np.load(vectors_path, mmap_mode="r+")
+
+    def _save(self):
+        """Writes the keys and metadata; the metadata is written last, so it never counts unsaved rows."""
+        with open(os.path.join(self.path, "keys.json"), "w", encoding="utf-8") as f:
+            json.dump(self.keys, f)
+        with open(os.path.join(self.path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"model": self.model, "dim": self.dim, "dtype": self.dtype.name, "count": self.count}, f)
+        if self._ivf is not None:
+            np.savez(os.path.join(self.path, "ivf.npz"), **self._ivf)
+
+
+def _top_k(scores, k):
+    """Returns the column indices of the `k` largest scores in each row, in descending order."""
+    if k <= 0:
+        return np.zeros((scores.shape[0], 0), dtype=np.int64)
+    if k < scores.shape[1]:
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1)
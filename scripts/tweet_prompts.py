@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to a character-based estimate
+    tiktoken = None
+
+
+def count_tokens(texts, model="gpt-4o"):
+    """
+    Counts tokens for each text.
+
+    Uses `tiktoken` when it is installed, otherwise estimates about four characters per token.
+
+    Parameters:
+    ----------
+    texts : pd.Series or list of str
+        The texts to measure.
+    model : str, optional
+        Model whose tokenizer is used (default 'gpt-4o'). Unknown models use `o200k_base`.
+
+    Returns:
+    -------
+    np.ndarray
+        Token count of each text.
+    """
+    texts = pd.Series(texts, dtype="string").fillna("")
+    if tiktoken is None:
+        return (texts.str.len() // 4 + 1).to_numpy(dtype=np.int64)
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("o200k_base")
+    return np.array([len(tokens) for tokens in encoding.encode_ordinary_batch(texts.tolist())], dtype=np.int64)
+
+
+def stratified_order(engagement, n_strata=5, seed=0):
+    """
+    Orders rows so that any prefix is a sample stratified by engagement.
+
+    Rows are split into `n_strata` equal-size engagement quantiles and shuffled within each
+    quantile. The order then takes one row from each quantile in turn, from highest to lowest
+    engagement. Cutting the order at any length therefore covers top, middle and low performers.
+
+    Parameters:
+    ----------
+    engagement : pd.Series
+        Engagement value of each row.
+    n_strata : int, optional
+        Number of engagement quantiles (default 5).
+    seed : int, optional
+        Seed of the within-quantile shuffle, so the same data gives the same sample (default 0).
+
+    Returns:
+    -------
+    np.ndarray
+        Row positions in sampling order.
+    """
+    n = len(engagement)
+    if n == 0:
+        return np.arange(0)
+    ranks = engagement.reset_index(drop=True).rank(method="first", ascending=False).to_numpy() - 1
+    stratum = (ranks * min(n_strata, n) // n).astype(np.int64)  # 0 = highest engagement
+    shuffle = np.random.default_rng(seed).random(n)
+
+    # Position of each row inside its stratum after shuffling
+    by_stratum = np.lexsort((shuffle, stratum))
+    starts = np.searchsorted(stratum[by_stratum], stratum[by_stratum])
+    within = np.empty(n, dtype=np.int64)
+    within[by_stratum] = np.arange(n) - starts
+
+    # Round-robin across strata: all rows with within == 0 first, highest stratum first, and so on
+    return np.lexsort((stratum, within))
+
+
+def tweet_lines(df, columns=("favorite_count", "text")):
+    """
+    Formats each tweet as one tab-separated line of `columns`, in row order.
+
+    Whitespace inside text is collapsed so each tweet stays on one line, and numbers are
+    written as integers.
+
+    Returns:
+    -------
+    pd.Series
+        One line per row, with a fresh RangeIndex.
+    """
+    fields = []
+    for col in columns:
+        values = df[col]
+        if pd.api.types.is_numeric_dtype(values):
+            values = values.round().astype("Int64").astype("string").fillna("")
+        else:
+            values = values.astype("string").fillna("").str.replace(r"\s+", " ", regex=True).str.strip()
+        fields.append(values.reset_index(drop=True))
+    return fields[0].str.cat(fields[1:], sep="\t") if len(fields) > 1 else fields[0]
+
+
+def build_tweet_context(df, token_budget, columns=("favorite_count", "text"), model="gpt-4o",
+                        engagement_col="engagement", n_strata=5, seed=0, line_tokens=None):
+    """
+    Packs as many tweets as fit in a token budget into a compact tab-separated block.
+
+    Tweets are chosen with `stratified_order`, so the block covers the whole engagement range
+    instead of only the top rows. The selected tweets are listed by engagement, highest first,
+    under a header line naming the columns. Whitespace inside text is collapsed so each tweet
+    stays on one line.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Tweets, with the requested `columns` and `engagement_col`.
+    token_budget : int
+        Maximum number of tokens of the returned block, header included.
+    columns : tuple of str, optional
+        Columns to include, in order (default: favorite_count, text).
+    model : str, optional
+        Model whose tokenizer is used to count tokens (default 'gpt-4o').
+    engagement_col : str, optional
+        Column used for stratification and ordering (default 'engagement').
+    n_strata : int, optional
+        Number of engagement quantiles to sample from (default 5).
+    seed : int, optional
+        Seed for the sample, so the same data gives the same prompt (default 0).
+    line_tokens : array-like of int, optional
+        Token count of each row's line, in row order, as given by
+        `count_tokens(tweet_lines(df, columns), model)`. Tokenizing is the slow part, so callers
+        that build contexts repeatedly from the same data can compute this once and pass it;
+        then only the selected tweets are formatted. Defaults to None (counted here).
+
+    Returns:
+    -------
+    tuple
+        A tuple containing:
+        - The TSV block (header and one line per tweet)
+        - The number of tweets included
+    """
+    header = "\t".join(columns)
+    budget = token_budget - int(count_tokens([header], model=model)[0]) - 1
+
+    if line_tokens is None:
+        line_tokens = count_tokens(tweet_lines(df, columns), model=model)
+    line_tokens = np.asarray(line_tokens, dtype=np.int64)
+    if len(line_tokens) != len(df):
+        raise ValueError("line_tokens must have one count per row of df.")
+
+    # Take the longest stratified prefix that fits (+1 token per line for the newline)
+    order = stratified_order(df[engagement_col], n_strata=n_strata, seed=seed)
+    n_included = int(np.searchsorted(np.cumsum(line_tokens[order] + 1), budget, side="right"))
+    selected = order[:n_included]
+
+    # Present the sample by engagement, highest first
+    engagement = df[engagement_col].to_numpy()[selected]
+    selected = selected[np.argsort(-engagement, kind="stable")]
+
+    # Only the selected rows need formatting once their token counts are known
+    return "\n".join([header, *tweet_lines(df.iloc[selected], columns).tolist()]), n_included
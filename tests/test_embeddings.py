@@ -0,0 +1,61 @@
+"""
+Unit tests for the batched embeddings in `scripts.embeddings`, using a fake `create`.
+
+Run from the repository root:
+
+    python -m unittest tests.test_embeddings
+"""
+import unittest
+from types import SimpleNamespace
+from scripts.embeddings import embed_texts, embedding_batches, embedding_inputs
+
+
+class FakeEmbeddings:
+    """Records each request and answers with the items in reverse order, as the API may reorder them."""
+
+    def __init__(self):
+        self.requests = []
+
+    def create(self, input, model):
+        if any(text == "" for text in input):
+            raise ValueError("'$.input' is invalid")  # what the API returns as a 400
+        self.requests.append(list(input))
+        # The embedding encodes the text, so tests can check which row it landed in
+        data = [SimpleNamespace(index=i, embedding=[float(len(text)), float(ord(text[0]))])
+                for i, text in enumerate(input)]
+        return SimpleNamespace(data=data[::-1])
+
+
+class EmbedTextsTest(unittest.TestCase):
+
+    def test_rows_follow_input_order_across_batches(self):
+        fake = FakeEmbeddings()
+        texts = ["a" * (i + 1) for i in range(7)]
+        embeddings = embed_texts(fake.create, texts, batch_size=3)
+
+        self.assertEqual([len(batch) for batch in fake.requests], [3, 3, 1])
+        self.assertEqual(sum(fake.requests, []), texts)
+        self.assertEqual(embeddings.shape, (7, 2))
+        self.assertEqual(embeddings[:, 0].tolist(), [float(len(text)) for text in texts])
+
+    def test_batches_respect_token_budget(self):
+        texts = ["x" * 40, "y" * 40, "z" * 40]  # ~11 tokens each
+        batches = list(embedding_batches(texts, batch_size=256, max_tokens_per_batch=25))
+        self.assertEqual(batches, [(0, texts[:2]), (2, texts[2:])])
+
+    def test_empty_texts_are_sent_as_a_space(self):
+        fake = FakeEmbeddings()
+        embeddings = embed_texts(fake.create, ["first", "", "line\nbreak", ""], batch_size=2)
+
+        self.assertEqual(fake.requests, [["first", " "], ["line break", " "]])
+        self.assertEqual(embeddings[:, 0].tolist(), [5.0, 1.0, 10.0, 1.0])
+
+    def test_no_texts(self):
+        fake = FakeEmbeddings()
+        self.assertEqual(embed_texts(fake.create, []).shape, (0, 0))
+        self.assertEqual(fake.requests, [])
+        self.assertEqual(embedding_inputs([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()